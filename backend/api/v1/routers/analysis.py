@@ -1,12 +1,20 @@
 # api/v1/routers/analysis.py
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Path
+from fastapi.responses import StreamingResponse
 from sse_starlette.sse import EventSourceResponse
 import json
 import asyncio
+import datetime
+import functools
+import zipfile
 from typing import List, Optional
 from api.v1.schemas.analysis import AnalysisResponse
-from graph.workflow import graph_app
-from core import db
+from graph.workflow import graph_flights, ANALYSIS_MODES, FINAL_NODES
+from graph.singleflight import analysis_key
+from core import db, metrics, profiling, startup
+from core.config import settings
+from services import comparison, exports, extraction, keyword_selection, matrix, normalization, rescoring, uploads
+from services.call_policy import ModelUnavailableError
 
 router = APIRouter()
 
@@ -20,118 +28,220 @@ SUPPORTED_FILE_TYPES = {
 # ... (imports and other code) ...
 
 
-async def run_single_analysis(resume: UploadFile, job_description: str) -> dict:
+def build_analysis_response(final_state: dict) -> AnalysisResponse:
+    """Builds the API response from the final graph state."""
+    return AnalysisResponse(
+        relevance_score=final_state["final_score"],
+        missing_keywords=final_state["hard_analysis"]["missing_keywords"],
+        verdict=final_state["final_verdict"],
+        suggestions=final_state["final_suggestions"],
+        degraded=final_state.get("degraded", []),
+    )
+
+
+def validate_mode(mode: str) -> str:
+    """Rejects unknown analysis modes with a 400."""
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown analysis mode '{mode}'. Use one of: {', '.join(ANALYSIS_MODES)}."
+        )
+    return mode
+
+
+def resolve_job_description(job_description: Optional[str], job_id: Optional[int]) -> str:
+    """
+    Returns the job description text to analyze against. With a `job_id` the
+    saved description is used and the evaluations are linked to it, so they can
+    be re-scored when it changes.
+    """
+    if job_id is not None:
+        job = db.get_job_description(job_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job description with ID {job_id} not found.")
+        return job["description"]
+    if not job_description:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide a job_description or a job_id.")
+    return job_description
+
+
+def _rescoring_inputs(final_state: dict, job_id: Optional[int]) -> dict:
+    """
+    The evaluation columns needed to re-score it later without the resume.
+    A run resumed from a checkpoint (or replayed from one) doesn't emit the
+    early nodes, so the keywords may be missing; they are then left NULL and
+    re-scoring skips the evaluation instead of scoring it against nothing.
+    """
+    if job_id is None:
+        return {}
+    if "normalized_resume" not in final_state or "jd_weights" not in final_state:
+        return {"job_id": job_id, "soft_analysis": final_state.get("soft_analysis") or None}
+    return {
+        "job_id": job_id,
+        "resume_keywords": json.dumps(sorted(set(final_state["normalized_resume"] or []))),
+        "jd_weights": json.dumps(final_state["jd_weights"] or {}),
+        # Absent in score mode, and empty when the soft comparison was degraded
+        "soft_analysis": final_state.get("soft_analysis") or None,
+    }
+
+
+async def _persist_error(filename: Optional[str], job_description: str, error: Exception) -> dict:
+    """Formats an error result and tries to persist it as well (non-blocking)."""
+    error_payload = {
+        "filename": filename,
+        "status": "error",
+        "detail": str(error)
+    }
+    try:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None,
+            db.save_evaluation,
+            filename,
+            job_description,
+            json.dumps(error_payload),
+            None,
+            None,
+        )
+    except Exception:
+        pass
+
+    return error_payload
+
+
+async def _upload_format(resume: UploadFile, spooled: uploads.SpooledUpload) -> Optional[str]:
+    """
+    The format declared by the upload's content type or, when it declares none
+    we support (e.g. application/octet-stream), the one sniffed from the file.
+    """
+    file_format = SUPPORTED_FILE_TYPES.get(resume.content_type)
+    if file_format is None:
+        file_format = await asyncio.to_thread(extraction.detect_format, spooled.path)
+    return file_format
+
+
+async def run_single_analysis(resume: UploadFile, job_description: str, mode: str = "full", lazy_suggestions: bool = False, budget: Optional[uploads.BatchBudget] = None, job_id: Optional[int] = None) -> dict:
     """
     Runs the full LangGraph analysis for a single resume file and returns the final result.
+    With `lazy_suggestions`, suggestions are left out and generated on the first
+    read of the stored evaluation.
     """
+    filename = getattr(resume, "filename", None)
     try:
-        # 1. Validate file type
-        file_type = resume.content_type
-        if file_type not in SUPPORTED_FILE_TYPES:
+        # 1. Spool the upload to disk
+        spooled = await uploads.spool_upload(resume, settings.MAX_UPLOAD_BYTES, budget)
+
+        # 2. Validate the file type, sniffing it when the upload doesn't say
+        file_format = await _upload_format(resume, spooled)
+        if file_format is None:
+            spooled.remove()
             raise ValueError(f"Unsupported file type for {resume.filename}")
+    except Exception as e:
+        return await _persist_error(filename, job_description, e)
+    return await run_spooled_analysis(spooled, file_format, job_description, mode, lazy_suggestions, job_id)
+
 
-        # 2. Prepare initial state for the graph
-        file_content = await resume.read()
+async def run_spooled_analysis(spooled: uploads.SpooledUpload, file_format: str, job_description: str, mode: str = "full", lazy_suggestions: bool = False, job_id: Optional[int] = None) -> dict:
+    """Runs the analysis for a resume already spooled to disk; the spooled file is always released."""
+    filename = spooled.filename
+    try:
+        # 3. Prepare initial state for the graph
         initial_state = {
-            "resume_file_content": file_content,
-            "file_format": SUPPORTED_FILE_TYPES[file_type],
+            "resume_path": spooled.path,
+            "file_format": file_format,
             "job_description": job_description,
+            "mode": mode,
+            "lazy_suggestions": lazy_suggestions,
             "progress": [],
-            "filename": getattr(resume, "filename", None),
+            "filename": filename,
         }
 
-        # 3. Invoke the graph and wait for the final result (no streaming)
-        final_state = await graph_app.ainvoke(initial_state)
+        # 4. Invoke the graph (or join an identical run already in flight) and
+        # wait for the final result (no streaming). The flight takes ownership
+        # of the spooled file.
+        key = analysis_key(spooled.sha256, job_description, mode, lazy_suggestions)
+        handed_over, spooled = spooled, None
+        final_state = await graph_flights.invoke(key, initial_state, cleanup=handed_over.remove)
 
-        # 4. Format the successful result
-        final_result = AnalysisResponse(
-            relevance_score=final_state["final_score"],
-            missing_keywords=final_state["hard_analysis"]["missing_keywords"],
-            verdict=final_state["final_verdict"],
-            suggestions=final_state["final_suggestions"]
-        )
+        # 5. Format the successful result
+        final_result = build_analysis_response(final_state)
 
         # Persist the evaluation result to the database in a thread to avoid blocking the event loop
+        evaluation_id = None
         try:
             loop = asyncio.get_running_loop()
-            await loop.run_in_executor(
+            suggestion_inputs = final_state.get("suggestion_inputs")
+            evaluation_id = await loop.run_in_executor(
                 None,
-                db.save_evaluation,
-                getattr(resume, "filename", None),
-                job_description,
-                json.dumps(final_result.model_dump()),
-                float(final_result.relevance_score),
-                final_result.verdict,
+                functools.partial(
+                    db.save_evaluation,
+                    filename,
+                    job_description,
+                    json.dumps(final_result.model_dump()),
+                    float(final_result.relevance_score),
+                    final_result.verdict,
+                    json.dumps(suggestion_inputs) if suggestion_inputs else None,
+                    **_rescoring_inputs(final_state, job_id),
+                ),
             )
         except Exception:
             # Swallow DB errors so they don't affect the analysis result returned to the client
             pass
 
         return {
-            "filename": resume.filename,
+            "filename": filename,
             "status": "success",
+            "evaluation_id": evaluation_id,
             "result": final_result.model_dump()
         }
     except Exception as e:
-        # 5. Format the error result
-        error_payload = {
-            "filename": getattr(resume, "filename", None),
-            "status": "error",
-            "detail": str(e)
-        }
-        # Try to persist the error record as well (non-blocking)
-        try:
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(
-                None,
-                db.save_evaluation,
-                getattr(resume, "filename", None),
-                job_description,
-                json.dumps(error_payload),
-                None,
-                None,
-            )
-        except Exception:
-            pass
-
-        return error_payload
+        # 6. Format and persist the error result
+        return await _persist_error(filename, job_description, e)
+    finally:
+        if spooled is not None:
+            spooled.remove()
     
 
 
-async def analysis_event_generator(initial_state: dict):
+async def analysis_event_generator(initial_state: dict, key: tuple, cleanup=None, job_id: Optional[int] = None):
     """
     This generator streams the progress of the LangGraph execution.
+    Identical concurrent requests share one execution and all receive its events.
+    If the client disconnects, the generator is cancelled and the shared run is
+    cancelled with it once no other request is waiting for it.
     """
-    async for event in graph_app.astream(initial_state):
+    # Node outputs accumulated so the saved evaluation can keep its re-scoring inputs
+    state = {}
+    async for event in graph_flights.stream(key, initial_state, cleanup):
         # The 'event' dictionary has keys corresponding to the node that just finished
         for node_name, node_output in event.items():
-            if node_name == "aggregate_results":
+            state.update(node_output or {})
+            if node_name in FINAL_NODES:
                 # This is the final state of the graph
                 final_state = node_output
-                final_result = AnalysisResponse(
-                    relevance_score=final_state["final_score"],
-                    missing_keywords=final_state["hard_analysis"]["missing_keywords"],
-                    verdict=final_state["final_verdict"],
-                    suggestions=final_state["final_suggestions"]
-                )
+                final_result = build_analysis_response(final_state)
                 # Persist the final result to the DB (use executor to avoid blocking)
                 try:
                     loop = asyncio.get_running_loop()
                     await loop.run_in_executor(
                         None,
-                        db.save_evaluation,
-                        initial_state.get("filename"),
-                        initial_state.get("job_description"),
-                        json.dumps(final_result.model_dump()),
-                        float(final_result.relevance_score),
-                        final_result.verdict,
+                        functools.partial(
+                            db.save_evaluation,
+                            initial_state.get("filename"),
+                            initial_state.get("job_description"),
+                            json.dumps(final_result.model_dump()),
+                            float(final_result.relevance_score),
+                            final_result.verdict,
+                            **_rescoring_inputs(state, job_id),
+                        ),
                     )
                 except Exception:
                     pass
 
-                # Yield the final, complete result
+                # Yield the final, complete result. The stream ends right after;
+                # leaving it early would count as the client going away.
                 yield json.dumps({"event": "final_result", "data": final_result.model_dump()})
-                return # Stop the generator
+                continue
 
             # Yield a progress update for the completed node
             progress_update = {
@@ -141,27 +251,107 @@ async def analysis_event_generator(initial_state: dict):
             yield json.dumps(progress_update)
 
 
+def _next_archive_member(members) -> Optional[tuple]:
+    """Decompresses the next archive member and sniffs its format from its first bytes."""
+    item = next(members, None)
+    if item is None:
+        return None
+    name, spooled = item
+    if isinstance(spooled, Exception):
+        return name, spooled, None
+    file_format = extraction.detect_format(spooled.path)
+    if file_format is None:
+        spooled.remove()
+        return name, ValueError(f"Unsupported file type for {name}"), None
+    return name, spooled, file_format
+
+
+async def analyze_archive(archive: UploadFile, job_description: str, mode: str, lazy_suggestions: bool, max_concurrency: int, job_id: Optional[int] = None) -> list:
+    """
+    Analyzes the resumes in a zip archive. Members are decompressed one at a
+    time and handed to the pipeline as they come out, with at most
+    `max_concurrency` of them on disk or in analysis at once.
+    """
+    try:
+        spooled_archive = await uploads.spool_upload(archive, settings.MAX_BATCH_UPLOAD_BYTES)
+    except uploads.UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    results: list = []
+    try:
+        if not zipfile.is_zipfile(spooled_archive.path):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The archive is not a valid zip file.")
+        budget = uploads.BatchBudget(settings.MAX_BATCH_UPLOAD_BYTES)
+        members = uploads.iter_zip_members(spooled_archive.path, settings.MAX_UPLOAD_BYTES, budget, settings.MAX_ARCHIVE_MEMBERS)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def guarded_run(spooled: uploads.SpooledUpload, file_format: str):
+            try:
+                return await run_spooled_analysis(spooled, file_format, job_description, mode, lazy_suggestions, job_id)
+            finally:
+                semaphore.release()
+
+        while True:
+            await semaphore.acquire()
+            try:
+                item = await asyncio.to_thread(_next_archive_member, members)
+            except uploads.UploadTooLargeError as e:
+                # The batch limit was hit; stop decompressing but keep what is running
+                semaphore.release()
+                results.append({"filename": archive.filename, "status": "error", "detail": str(e)})
+                break
+            if item is None:
+                semaphore.release()
+                break
+            name, spooled, file_format = item
+            if isinstance(spooled, Exception):
+                semaphore.release()
+                results.append(await _persist_error(name, job_description, spooled))
+                continue
+            results.append(asyncio.create_task(guarded_run(spooled, file_format)))
+
+        # Gather the analyses, keeping the archive order
+        return [await r if isinstance(r, asyncio.Task) else r for r in results]
+    except BaseException:
+        for r in results:
+            if isinstance(r, asyncio.Task):
+                r.cancel()
+        raise
+    finally:
+        spooled_archive.remove()
+
+
 @router.post("/analyze-batch")
 async def analyze_resume_batch(
-    resumes: List[UploadFile] = File(..., description="A batch of resume files (pdf, docx, or txt)."),
-    job_description: str = Form(..., description="The single job description to compare against.")
+    resumes: Optional[List[UploadFile]] = File(None, description="A batch of resume files (pdf, docx, or txt)."),
+    job_description: Optional[str] = Form(None, description="The single job description to compare against."),
+    mode: str = Form("full", description="'full' for the complete LLM report, 'score' for relevance score and missing keywords only."),
+    lazy_suggestions: bool = Form(False, description="Generate suggestions on the first GET /evaluations/{eval_id} instead of during the batch, for clients that fetch them there."),
+    archive: Optional[UploadFile] = File(None, description="Alternatively, a single zip of resumes. Each file's format is detected from its contents."),
+    job_id: Optional[int] = Form(None, description="Analyze against a saved job description instead, linking the evaluations to it for re-scoring."),
 ):
     """
     Analyzes a batch of resumes against a single job description concurrently.
     Returns a list of results once all analyses are complete.
     """
-    # 1. Validate file types before scheduling work
-    for r in resumes:
-        if r.content_type not in SUPPORTED_FILE_TYPES:
-            return {"batch_results": [{"filename": getattr(r, "filename", None), "status": "error", "detail": "Unsupported file type"}]}
+    # 1. Validate the mode and file types before scheduling work
+    validate_mode(mode)
+    job_description = resolve_job_description(job_description, job_id)
+    if bool(resumes) == bool(archive):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload either resume files or a single zip archive."
+        )
+    if archive is not None:
+        return {"batch_results": await analyze_archive(archive, job_description, mode, lazy_suggestions, max_concurrency=4, job_id=job_id)}
 
     # 2. Limit concurrency to avoid OOM / overloading; configurable via env var
     max_concurrency = 4
     semaphore = asyncio.Semaphore(max_concurrency)
+    budget = uploads.BatchBudget(settings.MAX_BATCH_UPLOAD_BYTES)
 
     async def guarded_run(resume_file: UploadFile):
         async with semaphore:
-            return await run_single_analysis(resume_file, job_description)
+            return await run_single_analysis(resume_file, job_description, mode, lazy_suggestions, budget, job_id)
 
     # 3. Create and run guarded tasks; gather results and handle exceptions per-file
     tasks = [asyncio.create_task(guarded_run(r)) for r in resumes]
@@ -186,7 +376,9 @@ async def analyze_resume_batch(
 @router.post("/analyze-stream")
 async def analyze_resume_stream(
     resume: UploadFile = File(..., description="The user's resume file (pdf, docx, or txt)."),
-    job_description: str = Form(..., description="The job description text.")
+    job_description: Optional[str] = Form(None, description="The job description text."),
+    mode: str = Form("full", description="'full' for the complete LLM report, 'score' for relevance score and missing keywords only."),
+    job_id: Optional[int] = Form(None, description="Analyze against a saved job description instead, linking the evaluation to it for re-scoring."),
 ):
     """
     Analyzes a resume against a job description and streams the progress.
@@ -195,28 +387,152 @@ async def analyze_resume_stream(
     - **Progress events**: `{"event": "progress", "data": {"step": "...", "progress": [...]}}`
     - **Final result event**: `{"event": "final_result", "data": { ...AnalysisResponse... }}`
     """
-    # 1. Validate file type
-    file_type = resume.content_type
-    if file_type not in SUPPORTED_FILE_TYPES:
+    # 1. Validate mode and job description
+    validate_mode(mode)
+    job_description = resolve_job_description(job_description, job_id)
+
+    # 2. Spool the upload to disk, validate its file type (sniffing it when the
+    # upload doesn't say) and prepare initial state for the graph
+    try:
+        spooled = await uploads.spool_upload(resume, settings.MAX_UPLOAD_BYTES)
+    except uploads.UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    file_format = await _upload_format(resume, spooled)
+    if file_format is None:
+        spooled.remove()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Unsupported file type. Please upload a PDF, DOCX, or TXT file."
         )
-    
-    # 2. Prepare initial state for the graph
-    file_content = await resume.read()
     initial_state = {
-        "resume_file_content": file_content,
-        "file_format": SUPPORTED_FILE_TYPES[file_type],
+        "resume_path": spooled.path,
+        "file_format": file_format,
         "job_description": job_description,
+        "mode": mode,
         "progress": [],
         "filename": getattr(resume, "filename", None),
     }
 
     # 3. Return the streaming response
-    return EventSourceResponse(analysis_event_generator(initial_state))
+    key = analysis_key(spooled.sha256, job_description, mode)
+    # Heartbeat comments keep idle proxies from closing long analyses
+    return EventSourceResponse(
+        analysis_event_generator(initial_state, key, spooled.remove, job_id),
+        ping=settings.SSE_HEARTBEAT_SECONDS,
+    )
+
+
+
+async def _prepare_matrix_resume(resume: UploadFile, budget: uploads.BatchBudget) -> dict:
+    """Extracts and normalizes one resume for the matrix, reading the upload once."""
+    spooled = await uploads.spool_upload(resume, settings.MAX_UPLOAD_BYTES, budget)
+    try:
+        file_format = await _upload_format(resume, spooled)
+        if file_format is None:
+            raise ValueError(f"Unsupported file type for {resume.filename}")
+        text = await asyncio.to_thread(extraction.extract_text_from_path, spooled.path, file_format)
+    finally:
+        spooled.remove()
+    keywords = await asyncio.to_thread(normalization.extract_keywords, text)
+    return {"filename": resume.filename, "text": text, "keywords": sorted(set(keywords))}
+
+
+async def _matrix_report(resume: dict, job: dict, score: int, missing: List[str]) -> dict:
+    """Runs the LLM report for one resume/job pair of the matrix."""
+    report = {"filename": resume["filename"], "job_id": job["id"], "relevance_score": score, "missing_keywords": missing}
+    try:
+        soft_analysis = await asyncio.to_thread(comparison.soft_compare_langchain, resume["text"], job["description"])
+        final_result = await asyncio.to_thread(
+            lambda: comparison.get_final_verdict_and_suggestions(
+                score=score, hard_analysis={"missing_keywords": missing}, soft_analysis=soft_analysis
+            )
+        )
+        report.update(verdict=final_result["verdict"], suggestions=final_result["suggestions"])
+    except ModelUnavailableError:
+        report.update(verdict=comparison.verdict_for_score(score), suggestions=None, degraded=["suggestions"])
+    return report
+
+
+@router.post("/analyze-matrix")
+async def analyze_matrix(
+    resumes: List[UploadFile] = File(..., description="Resume files (pdf, docx, or txt) to score."),
+    job_ids: List[int] = Form(..., description="IDs of saved job descriptions to score against."),
+    top_k: int = Form(0, description="Run the full LLM report for the top-k resumes of each job (0 for scores only)."),
+):
+    """
+    Scores N resumes against M saved jobs. Each resume is extracted and
+    normalized once, each job description is processed once, and the keyword
+    and embedding scores for all pairs are computed in vectorized passes.
+    Returns a compact matrix of relevance scores (rows: resumes, columns: jobs).
+    """
+    jobs = []
+    for job_id in job_ids:
+        job = db.get_job_description(job_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job description with ID {job_id} not found.")
+        jobs.append(dict(job))
+
+    # 1. Extract and normalize each resume once, with the same concurrency limit as batches
+    semaphore = asyncio.Semaphore(4)
+    budget = uploads.BatchBudget(settings.MAX_BATCH_UPLOAD_BYTES)
+
+    async def guarded_prepare(resume_file: UploadFile):
+        async with semaphore:
+            return await _prepare_matrix_resume(resume_file, budget)
+
+    prepared = await asyncio.gather(*(guarded_prepare(r) for r in resumes), return_exceptions=True)
+    errors = []
+    ready = []
+    for resume_file, item in zip(resumes, prepared):
+        if isinstance(item, Exception):
+            errors.append({"filename": resume_file.filename, "status": "error", "detail": str(item)})
+        else:
+            ready.append(item)
+
+    # 2. Process each job description once, then 3. score every pair, off the
+    # event loop: a changed JD corpus re-tokenizes every saved description
+    def score_pairs(resume_keywords: List[List[str]]) -> dict:
+        jd_weights = [keyword_selection.select_jd_keywords(normalization.extract_keywords(job["description"])) for job in jobs]
+        return matrix.score_matrix(resume_keywords, [list(weights) for weights in jd_weights], jd_weights)
+
+    scores = await asyncio.to_thread(score_pairs, [r["keywords"] for r in ready])
+    final = scores["final"]
+
+    # 4. Optionally run the LLM report for the best candidates of each job
+    reports = []
+    pairs = matrix.top_pairs(final, top_k) if ready else []
+    if pairs:
+        report_semaphore = asyncio.Semaphore(4)
+
+        async def guarded_report(r: int, j: int):
+            async with report_semaphore:
+                return await _matrix_report(ready[r], jobs[j], int(final[r, j]), matrix.missing_keywords(scores, r, j))
+
+        reports = await asyncio.gather(*(guarded_report(r, j) for r, j in pairs))
+
+    return {
+        "resumes": [r["filename"] for r in ready],
+        "jobs": [{"id": job["id"], "company_name": job["company_name"], "job_role": job["job_role"]} for job in jobs],
+        "scores": final.tolist(),
+        "degraded": [] if scores["embedding"] is not None else ["embedding_score"],
+        "reports": reports,
+        "errors": errors,
+    }
 
 
+@router.get("/metrics")
+async def get_metrics():
+    """Return process-wide counters, e.g. cancelled analyses, and the startup timings."""
+    return {"data": metrics.snapshot(), "startup": startup.report()}
+
+
+@router.get("/debug/profiles")
+async def get_profiles():
+    """Return the memory profiles of recent sampled analyses (PROFILING_ENABLED)."""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    return {"data": profiling.recent_profiles()}
+
 
 @router.post("/save-job-description", status_code=status.HTTP_200_OK)
 async def save_job_description(
@@ -294,6 +610,8 @@ async def update_job_description(
     company_name: str = Form(...),
     job_role: str = Form(...),
     description: str = Form(...),
+    rescore: bool = Form(False, description="Re-score the evaluations linked to this job against the new description."),
+    regenerate_text: bool = Form(False, description="With rescore, also regenerate suggestions (on each evaluation's next read)."),
 ):
     """Update an existing job description."""
     try:
@@ -301,13 +619,36 @@ async def update_job_description(
         if not updated:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job description not found")
         saved = db.get_job_description(job_id)
-        return {"message": "Updated", "saved": dict(saved) if saved else None}
+        response = {"message": "Updated", "saved": dict(saved) if saved else None}
+        if rescore:
+            response["rescore"] = await asyncio.to_thread(rescoring.rescore_job, job_id, description, regenerate_text)
+        return response
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.post("/job-descriptions/{job_id}/rescore")
+async def rescore_job_description(
+    job_id: int = Path(..., description="The ID of the job description whose evaluations to re-score"),
+    regenerate_text: bool = Form(False, description="Also regenerate suggestions (on each evaluation's next read)."),
+):
+    """
+    Re-scores the evaluations linked to a job description against its current
+    text, from the keywords stored with each evaluation. Resumes are not
+    re-uploaded or re-processed, and only new JD keywords are embedded.
+    """
+    job = db.get_job_description(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job description not found")
+    try:
+        summary = await asyncio.to_thread(rescoring.rescore_job, job_id, job["description"], regenerate_text)
+        return {"data": summary}
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 # New endpoints to fetch saved evaluations
 @router.get("/evaluations")
 async def list_evaluations():
@@ -317,6 +658,8 @@ async def list_evaluations():
         results = []
         for r in rows:
             rd = dict(r)
+            for column in ("suggestion_inputs", "resume_keywords", "jd_weights", "soft_analysis"):
+                rd.pop(column, None)
             # Try to parse result_json into a JSON object for easier consumption
             try:
                 rd["result"] = json.loads(rd.pop("result_json")) if rd.get("result_json") else None
@@ -328,14 +671,102 @@ async def list_evaluations():
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+EXPORT_FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+@router.get("/evaluations/export")
+async def export_evaluations(
+    format: str = "csv",
+    job_id: Optional[int] = None,
+    verdict: Optional[str] = None,
+    since: Optional[datetime.date] = None,
+    until: Optional[datetime.date] = None,
+):
+    """
+    Stream saved evaluations as CSV or Parquet, oldest first, optionally
+    filtered by job, verdict and creation date (`since` and `until` inclusive).
+    Rows are read and encoded a chunk at a time, so memory use stays flat
+    however many evaluations are exported.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{format}'. Expected one of: {', '.join(EXPORT_FORMATS)}",
+        )
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parquet export requires pyarrow (pip install pyarrow)")
+
+    chunks = db.iter_evaluations(
+        job_id=job_id,
+        verdict=verdict,
+        since=since.isoformat() if since else None,
+        until=(until + datetime.timedelta(days=1)).isoformat() if until else None,
+    )
+    body = exports.iter_parquet(chunks) if format == "parquet" else exports.iter_csv(chunks)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="evaluations.{format}"'},
+    )
+
+
+# Per-evaluation locks so concurrent first reads generate suggestions only once,
+# with the number of readers holding or waiting for each; a lock is dropped
+# only when none is left, so a later reader never gets a second lock
+_suggestion_locks: dict[int, asyncio.Lock] = {}
+_suggestion_waiters: dict[int, int] = {}
+
+
+async def _generate_pending_suggestions(eval_id: int) -> None:
+    """Generates and caches suggestions for an evaluation saved with lazy suggestions."""
+    lock = _suggestion_locks.setdefault(eval_id, asyncio.Lock())
+    _suggestion_waiters[eval_id] = _suggestion_waiters.get(eval_id, 0) + 1
+    try:
+        async with lock:
+            loop = asyncio.get_running_loop()
+            row = await loop.run_in_executor(None, db.get_evaluation, eval_id)
+            if row is None or not row["suggestion_inputs"]:
+                # Someone else generated them while we waited for the lock
+                return
+            inputs = json.loads(row["suggestion_inputs"])
+            result = json.loads(row["result_json"])
+            try:
+                generated = await loop.run_in_executor(
+                    None,
+                    lambda: comparison.get_final_verdict_and_suggestions(
+                        score=inputs["score"],
+                        hard_analysis={"missing_keywords": inputs["missing_keywords"]},
+                        soft_analysis=inputs["soft_analysis"],
+                    ),
+                )
+            except ModelUnavailableError:
+                # Leave the inputs in place so the next read retries
+                return
+            result["suggestions"] = generated["suggestions"]
+            await loop.run_in_executor(None, db.update_evaluation_result, eval_id, json.dumps(result))
+    finally:
+        _suggestion_waiters[eval_id] -= 1
+        if not _suggestion_waiters[eval_id]:
+            del _suggestion_waiters[eval_id]
+            del _suggestion_locks[eval_id]
+
+
 @router.get("/evaluations/{eval_id}")
 async def get_evaluation(eval_id: int):
-    """Fetch a specific saved evaluation by id."""
+    """Fetch a specific saved evaluation by id, generating pending suggestions on first read."""
     try:
         row = db.get_evaluation(eval_id)
         if row is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evaluation not found")
+        if row["suggestion_inputs"]:
+            await _generate_pending_suggestions(eval_id)
+            row = db.get_evaluation(eval_id)
         rd = dict(row)
+        for column in ("suggestion_inputs", "resume_keywords", "jd_weights", "soft_analysis"):
+            rd.pop(column, None)
         try:
             rd["result"] = json.loads(rd.pop("result_json")) if rd.get("result_json") else None
         except Exception:
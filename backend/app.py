@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import panel as pn
 import param
 from typing import List, Dict, Any
@@ -6,12 +7,71 @@ from typing import List, Dict, Any
 # --- Direct Import of Backend Logic ---
 # This assumes your project structure allows these imports
 from core import db
-from graph.workflow import graph_app
+from graph.workflow import graph_flights, FINAL_NODES
+from graph.singleflight import analysis_key
 from api.v1.schemas.analysis import AnalysisResponse
 
 # --- Configuration ---
 pn.extension(sizing_mode="stretch_width")
 
+# Resumes analyzed at once, as in the API's batch endpoint
+MAX_CONCURRENT_ANALYSES = 4
+# Progress events are applied to the cards at most this often, however many arrive
+UI_FRAMES_PER_SECOND = 10
+
+VERDICT_COLORS = {"high": "#28a745", "medium": "#ffc107"}
+
+
+class ResultCard(param.Parameterized):
+    """
+    The card for one resume. Its widgets are built once and updated in place
+    whenever the analysis state below changes.
+    """
+    status = param.String(default="Queued")
+    step = param.String(default="")
+    result = param.Dict(default=None, allow_None=True)
+
+    def __init__(self, title: str, **params):
+        super().__init__(**params)
+        self._spinner = pn.indicators.LoadingSpinner(value=False, width=20, height=20, visible=False)
+        self._status = pn.pane.Markdown("**Queued**", margin=(0, 5))
+        self._report = pn.pane.Markdown("", visible=False)
+        self.panel = pn.layout.Card(
+            pn.Row(self._spinner, self._status, align='center'),
+            self._report,
+            title=title,
+            styles={'border-left': '5px solid #6c757d'},
+        )
+
+    @param.depends('status', 'step', 'result', watch=True)
+    def _update(self):
+        analyzing = self.status == "Analyzing"
+        self._spinner.value = self._spinner.visible = analyzing
+        color = "#6c757d"
+        self._status.styles = {}
+        if analyzing:
+            self._status.object = f"**Analyzing...** (`{self.step or 'Starting'}`)"
+        elif self.status == "Complete":
+            res = self.result
+            self._status.object = "**✅ Complete**"
+            self._report.object = (
+                "---\n\n#### Report\n\n"
+                f"**Verdict:** {res.get('verdict', 'N/A')}\n\n"
+                f"**Relevance Score:** {res.get('relevance_score', 0)}%\n\n"
+                f"**Missing Keywords:**\n\n> {', '.join(res.get('missing_keywords', [])) or 'None'}\n\n"
+                f"**Suggestions:**\n\n> {res.get('suggestions') or 'N/A'}"
+            )
+            self._report.visible = True
+            color = VERDICT_COLORS.get(res.get('verdict', '').lower(), "#dc3545")
+        elif self.status == "Error":
+            self._status.object = f"**❌ Error:** {self.result['error']}"
+            self._status.styles = {'color': 'red'}
+            color = "#dc3545"
+        else:
+            self._status.object = f"**{self.status}**"
+        self.panel.styles = {'border-left': f'5px solid {color}'}
+
+
 # --- Application State Management using Param ---
 class AppState(param.Parameterized):
     # Widgets
@@ -23,14 +83,19 @@ class AppState(param.Parameterized):
     refresh_jobs_btn = param.Action(lambda self: self.fetch_jobs(), label="Refresh List")
     evaluate_btn = param.Action(lambda self: self._start_evaluation(), label="Analyze Resumes")
     
-    # Data
-    evaluations = param.Dict(default={}, doc="Stores the state of each resume analysis.")
-    
     # Internal state
     _modal_content = param.List(default=[])
 
     def __init__(self, **params):
         super().__init__(**params)
+        self.results_area = pn.Column(
+            pn.pane.Markdown("Upload resumes and select a job description to begin."),
+            sizing_mode="stretch_width",
+        )
+        # Card updates waiting for the next frame
+        self._pending: Dict[ResultCard, Dict[str, Any]] = {}
+        self._frames = None
+        self._running = 0
         self.fetch_jobs()
 
     @param.depends('refresh_jobs_btn', watch=True)
@@ -82,40 +147,58 @@ class AppState(param.Parameterized):
             pn.state.notifications.warning("Please upload resumes and select a job.")
             return
         
-        # Clear previous results
-        self.evaluations = {}
+        # Replace previous results with one card per file, built once
+        files = [(ResultCard(file_name), file_name, file_content) for file_name, file_content in self.resume_files]
+        self.results_area.objects = [card.panel for card, _, _ in files]
+
+        if self._frames is None:
+            self._frames = pn.state.add_periodic_callback(self._apply_pending, period=1000 // UI_FRAMES_PER_SECOND)
         
         # Schedule the coroutine to run without blocking
-        pn.state.schedule_coroutine(self._handle_evaluation_async())
+        pn.state.schedule_coroutine(self._handle_evaluation_async(files))
 
-    async def _handle_evaluation_async(self):
-        """Runs analysis for all uploaded resumes concurrently."""
+    def _set(self, card: ResultCard, **changes):
+        """Queues a card update; later changes to the same card within a frame win."""
+        self._pending.setdefault(card, {}).update(changes)
+
+    def _apply_pending(self):
+        """Applies the queued card updates, once per frame."""
+        pending, self._pending = self._pending, {}
+        for card, changes in pending.items():
+            card.param.update(**changes)
+
+    async def _handle_evaluation_async(self, files: List[tuple]):
+        """Runs analysis for all uploaded resumes, a few at a time."""
         job_info = db.get_job_description(int(self.job_select))
         job_description_text = job_info["description"]
-        
-        # Create a list of analysis tasks
-        analysis_tasks = [
-            self._run_analysis_for_file(file_content, file_name, job_description_text)
-            for file_name, file_content in self.resume_files
-        ]
-        await asyncio.gather(*analysis_tasks)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+
+        async def guarded_run(card: ResultCard, file_name: str, file_content: bytes):
+            async with semaphore:
+                await self._run_analysis_for_file(card, file_content, file_name, job_description_text)
+
+        self._running += 1
+        try:
+            await asyncio.gather(*(guarded_run(*file) for file in files))
+        finally:
+            self._running -= 1
+            # Show the last updates now rather than on a frame that may never come
+            self._apply_pending()
+            if not self._running and self._frames is not None:
+                self._frames.stop()
+                self._frames = None
     
-    async def _run_analysis_for_file(self, file_content: bytes, file_name: str, job_description: str):
-        """Handles the streaming analysis for a single file and updates its state."""
-        file_id = f"file_{hash(file_name)}"
-        
+    async def _run_analysis_for_file(self, card: ResultCard, file_content: bytes, file_name: str, job_description: str):
+        """Handles the streaming analysis for a single file and updates its card."""
         # Determine file format from extension
         file_ext = file_name.split('.')[-1].lower()
         file_format_map = {"pdf": "pdf", "docx": "docx", "txt": "txt"}
         file_format = file_format_map.get(file_ext)
         if not file_format:
-            self.evaluations[file_id] = {"name": file_name, "status": "Error", "result": {"error": "Unsupported file type"}}
-            self.param.trigger('evaluations')
+            self._set(card, status="Error", result={"error": "Unsupported file type"})
             return
 
-        # Set initial state
-        self.evaluations[file_id] = {"name": file_name, "status": "Analyzing", "progress": [], "result": None}
-        self.param.trigger('evaluations')
+        self._set(card, status="Analyzing", step="")
 
         try:
             initial_state = {
@@ -125,71 +208,28 @@ class AppState(param.Parameterized):
                 "progress": []
             }
 
-            # Stream results directly from the LangGraph app
-            async for event in graph_app.astream(initial_state):
+            # Stream results from the LangGraph app, sharing the run with any
+            # identical analysis already in flight
+            key = analysis_key(hashlib.sha256(file_content).hexdigest(), job_description, "full")
+            async for event in graph_flights.stream(key, initial_state):
                 node_name, node_output = next(iter(event.items()))
                 
-                if node_name == "__end__":
+                if node_name in FINAL_NODES:
                     final_state = node_output
                     final_result = AnalysisResponse(
                         relevance_score=final_state["final_score"],
                         missing_keywords=final_state["hard_analysis"]["missing_keywords"],
                         verdict=final_state["final_verdict"],
-                        suggestions=final_state["final_suggestions"]
+                        suggestions=final_state["final_suggestions"],
+                        degraded=final_state.get("degraded", []),
                     )
-                    self.evaluations[file_id]["status"] = "Complete"
-                    self.evaluations[file_id]["result"] = final_result.model_dump()
+                    self._set(card, status="Complete", result=final_result.model_dump())
                 else:
-                    self.evaluations[file_id]["progress"] = node_output.get("progress", [])
-                
-                self.param.trigger('evaluations') # Trigger UI update
+                    progress = (node_output or {}).get("progress", [])
+                    self._set(card, step=progress[-1] if progress else "")
 
         except Exception as e:
-            self.evaluations[file_id]["status"] = "Error"
-            self.evaluations[file_id]["result"] = {"error": str(e)}
-            self.param.trigger('evaluations')
-
-    @param.depends('evaluations', watch=True)
-    def _render_results_area(self):
-        """Renders the analysis results for each file based on the reactive state."""
-        if not self.evaluations:
-            return pn.pane.Markdown("Upload resumes and select a job description to begin.")
-
-        cards = []
-        for data in self.evaluations.values():
-            status_ui = []
-            result_ui = pn.Column()
-            verdict_class = ""
-
-            if data["status"] == "Analyzing":
-                status_ui.append(pn.indicators.LoadingSpinner(value=True, width=20, height=20))
-                status_ui.append(pn.pane.Markdown(f"**Analyzing...** (`{data['progress'][-1] if data['progress'] else 'Starting'}`)", margin=(0, 5)))
-            
-            elif data["status"] == "Complete":
-                res = data["result"]
-                verdict = res.get('verdict', '').lower()
-                status_ui.append(pn.pane.Markdown("**✅ Complete**", margin=(0, 5)))
-                result_ui = pn.Column(
-                    pn.layout.Divider(),
-                    pn.pane.Markdown("#### Report"),
-                    pn.pane.Markdown(f"**Verdict:** {res.get('verdict', 'N/A')}"),
-                    pn.pane.Markdown(f"**Relevance Score:** {res.get('relevance_score', 0)}%"),
-                    pn.pane.Markdown(f"**Missing Keywords:**\n\n> {', '.join(res.get('missing_keywords', [])) or 'None'}"),
-                    pn.pane.Markdown(f"**Suggestions:**\n\n> {res.get('suggestions', 'N/A')}"),
-                )
-            
-            elif data["status"] == "Error":
-                status_ui.append(pn.pane.Markdown(f"**❌ Error:** {data['result']['error']}", margin=(0, 5), style={'color': 'red'}))
-
-            cards.append(
-                pn.layout.Card(
-                    pn.Row(*status_ui, align='center'),
-                    result_ui,
-                    title=data["name"],
-                    styles={'border-left': f'5px solid {"#28a745" if data["status"] == "Complete" and verdict == "high" else "#ffc107" if data["status"] == "Complete" and verdict == "medium" else "#dc3545" if data["status"] == "Complete" else "#6c757d"}'}
-                )
-            )
-        return pn.Column(*cards, sizing_mode="stretch_width")
+            self._set(card, status="Error", result={"error": str(e)})
 
 # --- UI Layout ---
 def create_app():
@@ -202,7 +242,7 @@ def create_app():
     sidebar = pn.Column(
         pn.pane.Markdown("#### Controls"),
         file_input,
-        pn.bind(pn.widgets.Select.from_param, state.param.job_select, name="Select Job Description"),
+        pn.widgets.Select.from_param(state.param.job_select, name="Select Job Description"),
         pn.Row(
             pn.widgets.Button.from_param(state.param.add_job_btn),
             pn.widgets.Button.from_param(state.param.refresh_jobs_btn, button_type="default"),
@@ -214,7 +254,7 @@ def create_app():
 
     main_area = pn.Column(
         pn.pane.Markdown("#### Analysis Results"),
-        state._render_results_area,
+        state.results_area,
     )
 
     template = pn.template.FastListTemplate(
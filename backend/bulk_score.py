@@ -0,0 +1,225 @@
+# bulk_score.py
+"""
+Offline bulk scoring of a directory of resumes against saved job descriptions.
+
+    python bulk_score.py resumes/ --output scores.csv
+    python bulk_score.py resumes/ --job-id 3 --job-id 7 --output scores.parquet
+    python bulk_score.py resumes/ --output db
+
+Text extraction and normalization run in a process pool; scoring runs in chunks
+through the same matrix engine as /analyze-matrix, with a bounded number of
+chunks in flight against the embedding model. Results are written as each chunk
+finishes and every scored file is recorded in a progress file, so a killed run
+picks up where it stopped when started again with the same arguments.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from core import db
+from services import extraction, keyword_selection, matrix, normalization
+from services.comparison import verdict_for_score
+
+EXTENSION_FORMATS = {".pdf": "pdf", ".docx": "docx", ".txt": "txt"}
+
+
+def iter_resume_files(directory: Path) -> Iterator[Path]:
+    """Walks the directory lazily, yielding supported resume files in a stable order."""
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir():
+                yield from iter_resume_files(Path(entry.path))
+            elif Path(entry.name).suffix.lower() in EXTENSION_FORMATS:
+                yield Path(entry.path)
+
+
+def prepare_file(path: str) -> dict:
+    """Extracts and normalizes one resume. Runs in a worker process."""
+    try:
+        file_format = EXTENSION_FORMATS[Path(path).suffix.lower()]
+        text = extraction.extract_text_from_path(path, file_format)
+        return {"path": path, "keywords": sorted(set(normalization.extract_keywords(text)))}
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+class ProgressLog:
+    """Append-only record of the files already scored."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: Set[str] = set()
+        if path.exists():
+            self.done = {line.rstrip("\n") for line in path.open(encoding="utf-8") if line.strip()}
+
+    def mark(self, files: List[str]) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            f.writelines(f"{name}\n" for name in files)
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(files)
+
+
+class ResultWriter:
+    """Writes score rows incrementally to a CSV file, a Parquet dataset directory or the evaluations table."""
+
+    FIELDS = ["filename", "job_id", "relevance_score", "hard_score", "embedding_score", "verdict", "missing_keywords", "error"]
+
+    def __init__(self, output: str):
+        self.output = output
+        self._parts = 0
+        if output.endswith(".parquet"):
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)") from e
+            Path(output).mkdir(parents=True, exist_ok=True)
+            self._parts = len(list(Path(output).glob("part-*.parquet")))
+
+    def write(self, rows: List[dict], jobs: List[dict], jd_weights: List[Dict[str, float]]) -> None:
+        if not rows:
+            return
+        if self.output == "db":
+            descriptions = {job["id"]: job["description"] for job in jobs}
+            weights = {job["id"]: json.dumps(w) for job, w in zip(jobs, jd_weights)}
+            for row in rows:
+                result = {k: row[k] for k in ("relevance_score", "missing_keywords", "verdict")}
+                result.update(suggestions=None, degraded=[] if row["embedding_score"] is not None else ["embedding_score"])
+                links = {}
+                if row["error"]:
+                    result = {"filename": row["filename"], "status": "error", "detail": row["error"]}
+                else:
+                    links = {"resume_keywords": json.dumps(row["resume_keywords"]), "jd_weights": weights.get(row["job_id"])}
+                db.save_evaluation(
+                    row["filename"], descriptions.get(row["job_id"], ""), json.dumps(result),
+                    row["relevance_score"], row["verdict"], job_id=row["job_id"], **links,
+                )
+        elif self.output.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pylist(rows, schema=pa.schema([
+                ("filename", pa.string()), ("job_id", pa.int64()), ("relevance_score", pa.float64()),
+                ("hard_score", pa.float64()), ("embedding_score", pa.float64()), ("verdict", pa.string()),
+                ("missing_keywords", pa.list_(pa.string())), ("error", pa.string()),
+            ]))
+            pq.write_table(table, Path(self.output) / f"part-{self._parts:05d}.parquet")
+            self._parts += 1
+        else:
+            is_new = not Path(self.output).exists()
+            with open(self.output, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS, extrasaction="ignore")
+                if is_new:
+                    writer.writeheader()
+                for row in rows:
+                    writer.writerow({**row, "missing_keywords": ";".join(row["missing_keywords"] or [])})
+
+
+def score_chunk(chunk: List[dict], jobs: List[dict], jd_weights: List[Dict[str, float]]) -> List[dict]:
+    """Scores one chunk of prepared resumes against every job."""
+    rows = []
+    ok = [item for item in chunk if "error" not in item]
+    for item in chunk:
+        if "error" in item:
+            rows.extend({
+                "filename": item["path"], "job_id": job["id"], "relevance_score": None, "hard_score": None,
+                "embedding_score": None, "verdict": None, "missing_keywords": None, "error": item["error"],
+            } for job in jobs)
+    if not ok:
+        return rows
+    scores = matrix.score_matrix([item["keywords"] for item in ok], [list(weights) for weights in jd_weights], jd_weights)
+    for r, item in enumerate(ok):
+        for j, job in enumerate(jobs):
+            final = int(scores["final"][r, j])
+            rows.append({
+                "filename": item["path"],
+                "job_id": job["id"],
+                "relevance_score": float(final),
+                "hard_score": float(scores["hard"][r, j]),
+                "embedding_score": None if scores["embedding"] is None else float(scores["embedding"][r, j]),
+                "verdict": verdict_for_score(final),
+                "missing_keywords": matrix.missing_keywords(scores, r, j),
+                "error": None,
+                # Only stored with db output, so the evaluation can be re-scored later
+                "resume_keywords": item["keywords"],
+            })
+    return rows
+
+
+async def run(args: argparse.Namespace) -> None:
+    rows = [db.get_job_description(job_id) for job_id in args.job_id] if args.job_id else db.get_all_job_description()
+    jobs = [dict(row) for row in rows if row is not None]
+    if not jobs:
+        raise SystemExit("No saved job descriptions to score against")
+    jd_weights = [keyword_selection.select_jd_keywords(normalization.extract_keywords(job["description"])) for job in jobs]
+
+    progress = ProgressLog(Path(args.progress_file or f"{args.output.rstrip('/')}.progress"))
+    writer = ResultWriter(args.output)
+    pending = (str(p) for p in iter_resume_files(Path(args.directory)) if str(p) not in progress.done)
+    print(f"Scoring against {len(jobs)} job(s); {len(progress.done)} file(s) already done")
+
+    loop = asyncio.get_running_loop()
+    model_slots = asyncio.Semaphore(args.model_concurrency)
+    write_lock = asyncio.Lock()
+    scored = 0
+    failed = 0
+    started = time.monotonic()
+
+    async def handle(chunk: List[dict]) -> None:
+        nonlocal scored, failed
+        try:
+            chunk_rows = await asyncio.to_thread(score_chunk, chunk, jobs, jd_weights)
+            async with write_lock:
+                await asyncio.to_thread(writer.write, chunk_rows, jobs, jd_weights)
+                await asyncio.to_thread(progress.mark, [item["path"] for item in chunk])
+                scored += len(chunk)
+                print(f"{scored} file(s) scored ({scored / (time.monotonic() - started):.1f}/s)")
+        except Exception as e:
+            # The chunk's files are not marked done, so the next run retries them
+            failed += len(chunk)
+            print(f"Failed to score {len(chunk)} file(s) starting at {chunk[0]['path']}: {e!r}")
+        finally:
+            model_slots.release()
+
+    tasks = set()
+    with multiprocessing.Pool(args.processes) as pool:
+        prepared = pool.imap_unordered(prepare_file, pending, chunksize=8)
+        chunk: List[dict] = []
+        while True:
+            item: Optional[dict] = await loop.run_in_executor(None, next, prepared, None)
+            if item is not None:
+                chunk.append(item)
+            if chunk and (item is None or len(chunk) >= args.chunk_size):
+                # Bounded: wait for a free model slot before scheduling another chunk
+                await model_slots.acquire()
+                task = asyncio.create_task(handle(chunk))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                chunk = []
+            if item is None:
+                break
+        await asyncio.gather(*tasks)
+    print(f"Done: {scored} file(s) scored this run")
+    if failed:
+        raise SystemExit(f"{failed} file(s) could not be scored; run again to retry them")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory of .pdf/.docx/.txt resumes (searched recursively).")
+    parser.add_argument("--job-id", type=int, action="append", help="Saved job description ID (repeatable). Defaults to all.")
+    parser.add_argument("--output", required=True, help="A .csv file, a .parquet dataset directory, or 'db' for the evaluations table.")
+    parser.add_argument("--progress-file", help="Where completed files are recorded. Defaults to <output>.progress.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Worker processes for extraction and normalization.")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Resumes scored per matrix pass.")
+    parser.add_argument("--model-concurrency", type=int, default=2, help="Chunks scored against the embedding model at once.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
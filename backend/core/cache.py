@@ -0,0 +1,122 @@
+# core/cache.py
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from core import db
+from core.config import settings
+
+# Memory-map the cache file, so worker processes read hot pages straight from
+# the shared OS page cache instead of copying them into private buffers
+MMAP_BYTES = 256 * 1024 * 1024
+
+# Stay well below SQLite's limit on query parameters
+_CHUNK = 500
+
+
+class SharedCache:
+    """
+    A key/value cache in a local SQLite file, shared by every worker process on
+    the host: an entry stored by one worker is served to all of them.
+
+    Entries live in namespaces (e.g. "embeddings", "results") and may expire.
+    The cache is an optimization, so a failing cache reads as a miss and a
+    failing write is logged and dropped; callers never see cache errors.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        os.register_at_fork(after_in_child=self._forget_connection)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = db.connect(self.path)
+            conn.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+            with conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS cache (
+                        namespace TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        value BLOB NOT NULL,
+                        expires_at REAL,
+                        PRIMARY KEY (namespace, key)
+                    ) WITHOUT ROWID
+                    """
+                )
+            self._local.conn = conn
+        return conn
+
+    def _forget_connection(self) -> None:
+        # A forked child opens its own connection (see db._forget_connections)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            db._inherited.append(conn)
+        self._local = threading.local()
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Returns the unexpired values found for `keys`."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, bytes] = {}
+        try:
+            conn = self._connection()
+            now = time.time()
+            for start in range(0, len(keys), _CHUNK):
+                chunk = keys[start:start + _CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                cur = conn.execute(
+                    f"SELECT key, value FROM cache WHERE namespace = ? AND key IN ({placeholders}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    (namespace, *chunk, now),
+                )
+                found.update((row["key"], row["value"]) for row in cur)
+        except sqlite3.Error as e:
+            print(f"Shared cache unavailable: {e}")
+            return {}
+        return found
+
+    def set_many(self, namespace: str, values: Dict[str, bytes], ttl_seconds: Optional[float] = None) -> None:
+        """Stores values, replacing existing entries. `ttl_seconds` of None never expires."""
+        if not values:
+            return
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        try:
+            with self._connection() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    [(namespace, key, value, expires_at) for key, value in values.items()],
+                )
+                # Expired entries are only ever skipped on read; sweep them now and then
+                if random.random() < 0.01:
+                    conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            print(f"Could not write to the shared cache: {e}")
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return self.get_many(namespace, [key]).get(key)
+
+    def set(self, namespace: str, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        self.set_many(namespace, {key: value}, ttl_seconds)
+
+    def get_json(self, namespace: str, key: str) -> Any:
+        value = self.get(namespace, key)
+        return None if value is None else json.loads(value)
+
+    def set_json(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self.set(namespace, key, json.dumps(value).encode("utf-8"), ttl_seconds)
+
+
+def _default_path() -> Path:
+    return Path(settings.CACHE_DB_PATH) if settings.CACHE_DB_PATH else db.DB_PATH.with_name("cache.db")
+
+
+# Opened lazily, per thread, on first use
+shared = SharedCache(_default_path())
+
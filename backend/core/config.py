@@ -1,8 +1,79 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     """Loads environment variables from the .env file."""
     GOOGLE_API_KEY: str
+    # Point the model clients at another endpoint (e.g. http://localhost:8089 for
+    # tools/fake_model_server.py). Uses the REST transport when set.
+    GOOGLE_API_ENDPOINT: Optional[str] = None
+
+    # Call policy applied to every model call (see services/call_policy.py)
+    MODEL_RATE_PER_SECOND: float = 5.0
+    MODEL_BURST: int = 10
+    MODEL_MAX_RETRIES: int = 4
+    MODEL_BACKOFF_BASE_SECONDS: float = 0.5
+    MODEL_BACKOFF_MAX_SECONDS: float = 20.0
+    MODEL_HEDGE_AFTER_SECONDS: Optional[float] = None
+    MODEL_BREAKER_FAILURE_THRESHOLD: int = 5
+    MODEL_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Cross-request micro-batching of embedding calls
+    EMBED_BATCH_MAX_ITEMS: int = 100
+    EMBED_BATCH_WAIT_MS: float = 5.0
+    # Keep keyword embeddings in the shared cache so re-scoring only embeds new keywords
+    EMBEDDING_CACHE_ENABLED: bool = True
+
+    # Cache shared by every worker process (core/cache.py). Defaults to cache.db
+    # beside jobs.db; it only holds data that can be recomputed, so it is safe to delete.
+    CACHE_DB_PATH: Optional[str] = None
+    # Finished analyses are replayed from the shared cache for this long; 0 disables
+    RESULT_CACHE_TTL_SECONDS: int = 3600
+
+    # Request bodies over MAX_REQUEST_BYTES are refused with 413 before the form
+    # is parsed (core/request_limits.py); it leaves room for the form fields
+    # beside a full batch. The per-file and per-batch upload limits are checked
+    # as the parsed uploads are copied to disk.
+    MAX_REQUEST_BYTES: int = 201 * 1024 * 1024
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MAX_BATCH_UPLOAD_BYTES: int = 200 * 1024 * 1024
+    # Zip batch uploads: the limits above apply to uncompressed sizes
+    MAX_ARCHIVE_MEMBERS: int = 1000
+
+    # Match multi-word and symbol-bearing skills ("machine learning", "c++")
+    # from a phrase dictionary instead of single tokens. Defaults to
+    # services/skill_dictionary.txt.
+    SKILL_PHRASES_ENABLED: bool = True
+    SKILL_DICTIONARY_PATH: Optional[str] = None
+
+    # Job descriptions are reduced to their top-K keywords by TF-IDF against the
+    # saved job descriptions; 0 keeps every keyword (still weighted)
+    JD_KEYWORDS_TOP_K: int = 30
+
+    # Seconds between SSE heartbeat comments on /analyze-stream
+    SSE_HEARTBEAT_SECONDS: int = 15
+
+    # Persist graph checkpoints so a failed analysis resumes from its last
+    # completed node. Defaults to checkpoints.db beside jobs.db.
+    CHECKPOINT_ENABLED: bool = False
+    CHECKPOINT_DB_PATH: Optional[str] = None
+    # Checkpoints of runs not resumed within this many seconds are deleted; 0 keeps them
+    CHECKPOINT_TTL_SECONDS: int = 24 * 3600
+
+    # Load NLTK data, model clients, the skill dictionary and the graph during
+    # startup (timed in the startup report) instead of on the first request
+    STARTUP_WARMUP: bool = True
+
+    # Opt-in memory profiling of graph nodes (tracemalloc snapshots, RSS and
+    # top allocation sites), reported by GET /api/v1/debug/profiles. Only the
+    # PROFILING_SAMPLE_RATE fraction of analyses is traced.
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 1.0
+    PROFILING_TOP_N: int = 10
+    # How often a background thread samples RSS for the peak of sampled analyses
+    PROFILING_RSS_INTERVAL_SECONDS: float = 0.05
+
     model_config = SettingsConfigDict(env_file=".env")
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,19 +1,80 @@
 from pathlib import Path
+import os
 import sqlite3
-from typing import Optional, List
+import threading
+from typing import Iterator, Optional, List
 import json
 
 # Database file will be created at the backend/ level next to this package
 DB_PATH = Path(__file__).parent.parent / "jobs.db"
 
-# Ensure parent dir exists (it should) and create/connect to the sqlite database
-_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-_conn.row_factory = sqlite3.Row
+# How long a statement waits for another connection (or worker process) to
+# release its write lock before failing with "database is locked"
+BUSY_TIMEOUT_SECONDS = 30.0
 
-def _init_db() -> None:
+# Each thread opens its own connection on first use, and the schema is created
+# or migrated by the first of them, so importing this module doesn't touch the
+# disk. Connections are never shared between threads or processes.
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+# Connections inherited across a fork; kept open rather than closed in the
+# child, where closing them could release locks the parent still relies on
+_inherited: List[sqlite3.Connection] = []
+
+
+def connect(path, check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Open a connection configured for concurrent use by several worker
+    processes: WAL journaling, so readers never block the writer, and a busy
+    timeout instead of failing immediately on a locked database.
+    """
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    # Safe with WAL: a power loss can lose the last commits, never corrupt the file
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def _connection() -> sqlite3.Connection:
+    """Return this thread's connection, opening it on first use."""
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = connect(DB_PATH)
+        if not _schema_ready:
+            with _schema_lock:
+                if not _schema_ready:
+                    _init_db(conn)
+                    _schema_ready = True
+        _local.conn = conn
+    return conn
+
+
+def _forget_connections() -> None:
+    """Runs in a forked child, which must open connections of its own."""
+    global _local
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _inherited.append(conn)
+    _local = threading.local()
+
+
+os.register_at_fork(after_in_child=_forget_connections)
+
+
+def init_db() -> None:
+    """Open a connection and create or migrate the schema now instead of on first use."""
+    _connection()
+
+
+def _init_db(conn: sqlite3.Connection) -> None:
     """Create the job_descriptions and evaluations tables if they don't exist."""
-    with _conn:
-        _conn.execute(
+    # Take the write lock up front, so workers starting together migrate one at a time
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS job_descriptions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -26,7 +87,7 @@ def _init_db() -> None:
         )
 
         # Evaluations table stores the result of each resume analysis
-        _conn.execute(
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS evaluations (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -40,13 +101,38 @@ def _init_db() -> None:
             """
         )
 
-_init_db()
+        # Columns added after the initial schema; older databases are migrated in place
+        _ensure_column(conn, "evaluations", "suggestion_inputs", "TEXT")
+        # Inputs kept for re-scoring when the linked job description changes
+        _ensure_column(conn, "evaluations", "job_id", "INTEGER")
+        _ensure_column(conn, "evaluations", "resume_keywords", "TEXT")
+        _ensure_column(conn, "evaluations", "jd_weights", "TEXT")
+        # The LLM soft analysis, so suggestions can be regenerated after re-scoring
+        _ensure_column(conn, "evaluations", "soft_analysis", "TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_job_id ON evaluations (job_id)")
+
+        # Bumped with every job description edit (see job_descriptions_fingerprint)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS revisions (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+            """
+        )
+
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, ddl_type: str) -> None:
+    """Add a column to an existing table if it is missing."""
+    existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in existing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}")
 
 
 def save_job_description(company_name: str, job_role: str, description: str) -> int:
     """Insert a job description and return the inserted row id."""
-    with _conn:
-        cur = _conn.execute(
+    with _connection() as conn:
+        cur = conn.execute(
             "INSERT INTO job_descriptions (company_name, job_role, description) VALUES (?, ?, ?)",
             (company_name, job_role, description),
         )
@@ -55,50 +141,147 @@ def save_job_description(company_name: str, job_role: str, description: str) ->
 
 def get_job_description(job_id: int) -> Optional[sqlite3.Row]:
     """Fetch a saved job description by id."""
-    cur = _conn.execute("SELECT * FROM job_descriptions WHERE id = ?", (job_id,))
+    conn = _connection()
+    cur = conn.execute("SELECT * FROM job_descriptions WHERE id = ?", (job_id,))
     return cur.fetchone()
 
 
 def get_all_job_description() -> list[sqlite3.Row]:
     """Fetch all saved job descriptions."""
-    cur = _conn.execute("SELECT * FROM job_descriptions ORDER BY created_at DESC")
+    conn = _connection()
+    cur = conn.execute("SELECT * FROM job_descriptions ORDER BY created_at DESC")
     return cur.fetchall()
 
 
 def update_job_description(job_id: int, company_name: str, job_role: str, description: str) -> bool:
     """Update an existing job description. Returns True if a row was updated."""
-    with _conn:
-        cur = _conn.execute(
+    with _connection() as conn:
+        cur = conn.execute(
             "UPDATE job_descriptions SET company_name = ?, job_role = ?, description = ? WHERE id = ?",
             (company_name, job_role, description, job_id),
         )
+        # In the same transaction, so every worker sees the edit and the new revision together
+        conn.execute(
+            "INSERT INTO revisions (name, value) VALUES ('job_descriptions', 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1"
+        )
         return cur.rowcount > 0
 
 
+def job_descriptions_fingerprint() -> tuple:
+    """
+    A cheap value that changes whenever job descriptions are added, removed or
+    edited, by this process or any other.
+    """
+    conn = _connection()
+    cur = conn.execute(
+        "SELECT COUNT(*), MAX(id), TOTAL(LENGTH(description)), "
+        "(SELECT value FROM revisions WHERE name = 'job_descriptions') FROM job_descriptions"
+    )
+    return tuple(cur.fetchone())
+
+
 def list_job_descriptions() -> List[sqlite3.Row]:
     """Return all saved job descriptions."""
-    cur = _conn.execute("SELECT * FROM job_descriptions ORDER BY created_at DESC")
+    conn = _connection()
+    cur = conn.execute("SELECT * FROM job_descriptions ORDER BY created_at DESC")
     return cur.fetchall()
 
 
 # New evaluation-related functions
-def save_evaluation(filename: Optional[str], job_description: str, result_json: str, relevance_score: Optional[float], verdict: Optional[str]) -> int:
-    """Persist an analysis result and return the inserted row id."""
-    with _conn:
-        cur = _conn.execute(
-            "INSERT INTO evaluations (filename, job_description, result_json, relevance_score, verdict) VALUES (?, ?, ?, ?, ?)",
-            (filename, job_description, result_json, relevance_score, verdict),
+def save_evaluation(filename: Optional[str], job_description: str, result_json: str, relevance_score: Optional[float], verdict: Optional[str], suggestion_inputs: Optional[str] = None, job_id: Optional[int] = None, resume_keywords: Optional[str] = None, jd_weights: Optional[str] = None, soft_analysis: Optional[str] = None) -> int:
+    """Persist an analysis result and return the inserted row id.
+
+    `suggestion_inputs` holds the JSON inputs needed to generate suggestions
+    later, for evaluations whose suggestions are generated on first read.
+    `job_id` links the evaluation to a saved job description; together with the
+    JSON `resume_keywords` and `jd_weights` it lets the evaluation be re-scored
+    when that description changes; `soft_analysis` (full-mode analyses only)
+    lets its suggestions be regenerated after re-scoring.
+    """
+    with _connection() as conn:
+        cur = conn.execute(
+            "INSERT INTO evaluations (filename, job_description, result_json, relevance_score, verdict, suggestion_inputs, job_id, resume_keywords, jd_weights, soft_analysis) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (filename, job_description, result_json, relevance_score, verdict, suggestion_inputs, job_id, resume_keywords, jd_weights, soft_analysis),
         )
         return cur.lastrowid
 
 
+def get_evaluations_for_job(job_id: int) -> List[sqlite3.Row]:
+    """Fetch the evaluations linked to a saved job description."""
+    conn = _connection()
+    cur = conn.execute("SELECT * FROM evaluations WHERE job_id = ? ORDER BY id", (job_id,))
+    return cur.fetchall()
+
+
+def update_rescored_evaluations(updates: List[tuple]) -> int:
+    """
+    Apply re-scoring results in one transaction. Each update is a tuple of
+    (result_json, relevance_score, verdict, job_description, jd_weights,
+    suggestion_inputs, eval_id). Returns the number of rows updated.
+    """
+    with _connection() as conn:
+        cur = conn.executemany(
+            "UPDATE evaluations SET result_json = ?, relevance_score = ?, verdict = ?, job_description = ?, jd_weights = ?, suggestion_inputs = ? WHERE id = ?",
+            updates,
+        )
+        return cur.rowcount
+
+
+def update_evaluation_result(eval_id: int, result_json: str) -> bool:
+    """Replace an evaluation's result and clear its pending suggestion inputs."""
+    with _connection() as conn:
+        cur = conn.execute(
+            "UPDATE evaluations SET result_json = ?, suggestion_inputs = NULL WHERE id = ?",
+            (result_json, eval_id),
+        )
+        return cur.rowcount > 0
+
+
 def get_evaluation(eval_id: int) -> Optional[sqlite3.Row]:
     """Fetch a saved evaluation by id."""
-    cur = _conn.execute("SELECT * FROM evaluations WHERE id = ?", (eval_id,))
+    conn = _connection()
+    cur = conn.execute("SELECT * FROM evaluations WHERE id = ?", (eval_id,))
     return cur.fetchone()
 
 
 def get_all_evaluations() -> list[sqlite3.Row]:
     """Fetch all saved evaluations ordered by newest first."""
-    cur = _conn.execute("SELECT * FROM evaluations ORDER BY created_at DESC")
-    return cur.fetchall()
\ No newline at end of file
+    conn = _connection()
+    cur = conn.execute("SELECT * FROM evaluations ORDER BY created_at DESC")
+    return cur.fetchall()
+
+
+def iter_evaluations(job_id: Optional[int] = None, verdict: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None, chunk_size: int = 500) -> Iterator[List[sqlite3.Row]]:
+    """
+    Yield saved evaluations oldest first, in chunks of `chunk_size` rows read
+    from one cursor, so memory use doesn't grow with the table.
+
+    `since` and `until` bound created_at (inclusive lower, exclusive upper) and
+    compare as 'YYYY-MM-DD[ HH:MM:SS]' strings. The rows come from a single
+    snapshot of the database; writes made while iterating are not seen.
+    """
+    clauses, params = [], []
+    for clause, value in (("job_id = ?", job_id), ("verdict = ?", verdict), ("created_at >= ?", since), ("created_at < ?", until)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    init_db()
+    # A connection of its own: a streaming response resumes the iteration on
+    # whichever worker thread is free, and the cursor must stay open across them
+    conn = connect(DB_PATH, check_same_thread=False)
+    try:
+        cur = conn.execute(
+            "SELECT id, created_at, filename, job_id, relevance_score, verdict, result_json "
+            f"FROM evaluations{where} ORDER BY id",
+            params,
+        )
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
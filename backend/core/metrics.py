@@ -0,0 +1,18 @@
+# core/metrics.py
+import threading
+from collections import Counter
+
+_lock = threading.Lock()
+_counters: Counter = Counter()
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Increment a named process-wide counter."""
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot() -> dict:
+    """Return a copy of all counters."""
+    with _lock:
+        return dict(_counters)
@@ -0,0 +1,177 @@
+# core/profiling.py
+import contextvars
+import functools
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from core.config import settings
+
+# Finished analysis profiles kept for GET /debug/profiles
+PROFILE_HISTORY = 50
+
+# Allocations made by the profiler itself are left out of the reports
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_lock = threading.Lock()
+_tracing = 0
+_history: deque = deque(maxlen=PROFILE_HISTORY)
+# Sampled analyses in progress, whose peak RSS the sampler thread tracks
+_active: Set["AnalysisProfile"] = set()
+_sampler: Optional[threading.Thread] = None
+
+
+def rss_bytes() -> int:
+    """The resident set size of this process now (its peak where that isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class AnalysisProfile:
+    """Memory and timing measurements for one sampled analysis, node by node."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self._began = time.perf_counter()
+        self.nodes: List[Dict[str, Any]] = []
+        self.rss_start = self.peak_rss = rss_bytes()
+        self.seconds: Optional[float] = None
+
+    def sample_rss(self, rss: Optional[int] = None) -> int:
+        rss = rss_bytes() if rss is None else rss
+        with _lock:
+            self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "analysis": self.name,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "rss_start_bytes": self.rss_start,
+            "peak_rss_bytes": self.peak_rss,
+            "nodes": self.nodes,
+        }
+
+
+# The profile of the analysis running in the current context, if it was
+# sampled; LangGraph copies the context into the threads that run sync nodes
+current_profile: contextvars.ContextVar[Optional[AnalysisProfile]] = contextvars.ContextVar("analysis_profile", default=None)
+
+
+def _sample_peaks() -> None:
+    """Samples RSS into every active profile until none is left, so peaks inside a node count too."""
+    global _sampler
+    while True:
+        with _lock:
+            if not _active:
+                _sampler = None
+                return
+            profiles = list(_active)
+        rss = rss_bytes()
+        for profile in profiles:
+            profile.sample_rss(rss)
+        time.sleep(settings.PROFILING_RSS_INTERVAL_SECONDS)
+
+
+def start_analysis(name: str) -> Optional[AnalysisProfile]:
+    """
+    Decides whether to profile an analysis (PROFILING_SAMPLE_RATE) and, if so,
+    starts allocation tracing and RSS sampling for it. Both only run while at
+    least one sampled analysis is in progress.
+    """
+    global _tracing, _sampler
+    if not settings.PROFILING_ENABLED or random.random() >= settings.PROFILING_SAMPLE_RATE:
+        return None
+    profile = AnalysisProfile(name)
+    with _lock:
+        if _tracing == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing += 1
+        _active.add(profile)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_peaks, name="rss-sampler", daemon=True)
+            _sampler.start()
+    return profile
+
+
+def finish_analysis(profile: Optional[AnalysisProfile]) -> None:
+    """Records a finished (or failed) analysis and stops tracing once none is left."""
+    global _tracing
+    if profile is None:
+        return
+    profile.seconds = round(time.perf_counter() - profile._began, 3)
+    profile.sample_rss()
+    with _lock:
+        _active.discard(profile)
+        _history.append(profile.report())
+        _tracing -= 1
+        if _tracing == 0:
+            tracemalloc.stop()
+
+
+def recent_profiles() -> List[Dict[str, Any]]:
+    """The most recent analysis profiles, oldest first."""
+    with _lock:
+        return list(_history)
+
+
+def _top_allocations(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> List[Dict[str, Any]]:
+    stats = after.filter_traces(_IGNORED).compare_to(before.filter_traces(_IGNORED), "lineno")
+    grown = [stat for stat in stats if stat.size_diff > 0][:settings.PROFILING_TOP_N]
+    return [
+        {
+            "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_diff_bytes": stat.size_diff,
+            "count_diff": stat.count_diff,
+        }
+        for stat in grown
+    ]
+
+
+def profiled(name: str, node: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    """
+    Wraps a graph node so sampled analyses record, for the node: its duration,
+    the RSS after it, the net memory it allocated and its top allocation sites.
+
+    tracemalloc is process-wide, so with analyses running concurrently a node's
+    allocations include whatever the others allocated meanwhile.
+    """
+    @functools.wraps(node)
+    def wrapper(state: dict) -> dict:
+        profile = current_profile.get()
+        if profile is None or not tracemalloc.is_tracing():
+            return node(state)
+        before = tracemalloc.take_snapshot()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        began = time.perf_counter()
+        try:
+            return node(state)
+        finally:
+            seconds = time.perf_counter() - began
+            after = tracemalloc.take_snapshot()
+            profile.nodes.append({
+                "node": name,
+                "seconds": round(seconds, 3),
+                "rss_bytes": profile.sample_rss(),
+                "allocated_bytes": tracemalloc.get_traced_memory()[0] - traced_before,
+                "top_allocations": _top_allocations(before, after),
+            })
+
+    return wrapper
@@ -0,0 +1,66 @@
+# core/request_limits.py
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestTooLargeError(Exception):
+    """Raised from receive() once a request body passes the size limit."""
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Refuses request bodies larger than `max_bytes` with 413 before the form
+    parser spools them: up front when Content-Length is too large, otherwise
+    (chunked bodies) as soon as the bytes received pass the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._too_large()(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise RequestTooLargeError
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            # Whatever the app makes of the aborted body is replaced by the 413
+            if exceeded:
+                return
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # The app may wrap the error (FastAPI reports body errors as 400)
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await self._too_large()(scope, receive, send)
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse(
+            {"detail": f"Request body exceeds the {self.max_bytes} byte limit"},
+            status_code=413,
+            headers={"Connection": "close"},
+        )
@@ -0,0 +1,39 @@
+# core/startup.py
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+# Imported first thing in main.py, so this is roughly when the app started loading
+_started = time.perf_counter()
+_lock = threading.Lock()
+_phases: Dict[str, float] = {}
+
+
+@contextmanager
+def phase(name: str):
+    """Times a startup phase for the startup report."""
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            _phases[name] = time.perf_counter() - began
+
+
+def mark_ready() -> None:
+    """Records the total time from the first import to being ready to serve."""
+    with _lock:
+        _phases["total"] = time.perf_counter() - _started
+
+
+def report() -> Dict[str, float]:
+    """Seconds spent in each startup phase, in the order they ran."""
+    with _lock:
+        return {name: round(seconds, 3) for name, seconds in _phases.items()}
+
+
+def print_report() -> None:
+    print("Startup timings:")
+    for name, seconds in report().items():
+        print(f"  {name:<28} {seconds:7.3f}s")
@@ -0,0 +1,123 @@
+# graph/checkpointing.py
+import time
+from pathlib import Path
+
+from core.config import settings
+from core.db import DB_PATH
+
+# Channels that are never written to checkpoints. The raw upload bytes are only
+# needed by extract_text, and a run that failed there restarts from scratch.
+EXCLUDED_CHANNELS = ("resume_file_content",)
+
+# How often, at most, checkpoint writes also sweep out expired threads
+SWEEP_INTERVAL_SECONDS = 3600
+
+
+def checkpoint_db_path() -> Path:
+    """The checkpoint database, stored beside jobs.db unless configured otherwise."""
+    if settings.CHECKPOINT_DB_PATH:
+        return Path(settings.CHECKPOINT_DB_PATH)
+    return DB_PATH.parent / "checkpoints.db"
+
+
+def thread_id_for(key: tuple) -> str:
+    """The checkpoint thread of an analysis, derived from its single-flight key."""
+    return ":".join(str(part) for part in key)
+
+
+def open_checkpointer():
+    """
+    Creates the SQLite checkpointer. Must be called from the running event loop,
+    which the saver binds to. Requires the langgraph-checkpoint-sqlite package.
+    """
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+        raise RuntimeError(
+            "CHECKPOINT_ENABLED requires the langgraph-checkpoint-sqlite package "
+            "(pip install langgraph-checkpoint-sqlite)"
+        ) from e
+
+    def _strip(channel: str, value):
+        # The graph input is also stored whole under the __start__ channel
+        if channel == "__start__" and isinstance(value, dict):
+            return {k: v for k, v in value.items() if k not in EXCLUDED_CHANNELS}
+        return value
+
+    class SlimSqliteSaver(AsyncSqliteSaver):
+        """
+        An AsyncSqliteSaver that leaves EXCLUDED_CHANNELS out of checkpoints and
+        deletes threads nobody resumed within CHECKPOINT_TTL_SECONDS (runs that
+        failed and were never submitted again).
+        """
+
+        _activity_ready = False
+        _last_sweep = float("-inf")
+
+        async def setup(self) -> None:
+            await super().setup()
+            if self._activity_ready:
+                return
+            async with self.lock:
+                await self.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, updated_at REAL NOT NULL)"
+                )
+                # Threads saved before activity was tracked expire one TTL from now
+                await self.conn.execute(
+                    "INSERT OR IGNORE INTO thread_activity (thread_id, updated_at) SELECT DISTINCT thread_id, ? FROM checkpoints",
+                    (time.time(),),
+                )
+                await self.conn.commit()
+            self._activity_ready = True
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            values = checkpoint.get("channel_values", {})
+            checkpoint = {
+                **checkpoint,
+                "channel_values": {k: _strip(k, v) for k, v in values.items() if k not in EXCLUDED_CHANNELS},
+            }
+            saved = await super().aput(config, checkpoint, metadata, new_versions)
+            async with self.lock:
+                await self.conn.execute(
+                    "INSERT OR REPLACE INTO thread_activity (thread_id, updated_at) VALUES (?, ?)",
+                    (str(config["configurable"]["thread_id"]), time.time()),
+                )
+                await self.conn.commit()
+            if time.monotonic() - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+                self._last_sweep = time.monotonic()
+                await self.sweep()
+            return saved
+
+        async def adelete_thread(self, thread_id: str) -> None:
+            await self.setup()
+            await super().adelete_thread(thread_id)
+            async with self.lock:
+                await self.conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+                await self.conn.commit()
+
+        async def sweep(self) -> int:
+            """Deletes the threads last written more than CHECKPOINT_TTL_SECONDS ago. Returns how many."""
+            if settings.CHECKPOINT_TTL_SECONDS <= 0:
+                return 0
+            await self.setup()
+            async with self.lock:
+                async with self.conn.execute(
+                    "SELECT thread_id FROM thread_activity WHERE updated_at < ?",
+                    (time.time() - settings.CHECKPOINT_TTL_SECONDS,),
+                ) as cur:
+                    expired = [row[0] for row in await cur.fetchall()]
+            for thread_id in expired:
+                await self.adelete_thread(thread_id)
+            if expired:
+                print(f"Deleted {len(expired)} expired checkpoint threads")
+            return len(expired)
+
+        async def aput_writes(self, config, writes, task_id, task_path=""):
+            writes = [(channel, _strip(channel, value)) for channel, value in writes if channel not in EXCLUDED_CHANNELS]
+            return await super().aput_writes(config, writes, task_id, task_path)
+
+    conn = aiosqlite.connect(checkpoint_db_path(), check_same_thread=False)
+    # The connection's worker thread must not keep the process alive on shutdown
+    conn.daemon = True
+    return SlimSqliteSaver(conn)
@@ -1,16 +1,23 @@
 # graph/nodes.py
 from graph.state import GraphState
-from services import extraction, normalization, comparison
+from services import extraction, normalization, comparison, keyword_selection
+from services.call_policy import ModelUnavailableError
 
 def extract_text(state: GraphState) -> dict:
     """Extracts text from the resume."""
     print("---NODE: EXTRACTING TEXT---")
-    file_content = state["resume_file_content"]
     file_format = state["file_format"]
     
-    extracted_text = extraction.extract_text_from_file_content(file_content, file_format)
+    # API uploads are spooled to disk and passed by path; the Panel app
+    # still passes the raw bytes.
+    if state.get("resume_path"):
+        extracted_text = extraction.extract_text_from_path(state["resume_path"], file_format)
+    else:
+        extracted_text = extraction.extract_text_from_file_content(state["resume_file_content"], file_format)
     
+    # Drop the raw bytes so they aren't carried through the remaining nodes
     return {
+        "resume_file_content": None,
         "resume_text": extracted_text,
         "progress": ["Text Extracted"]
     }
@@ -21,60 +28,137 @@ def normalize_texts(state: GraphState) -> dict:
     resume_text = state["resume_text"]
     jd_text = state["job_description"]
     
-    # norm_resume = normalization.normalize_text(resume_text)
-    norm_jd = normalization.normalize_text(jd_text)
+    # Skill phrases where the texts mention any, single tokens otherwise
+    norm_resume = normalization.extract_keywords(resume_text)
+    # Only the top-weighted JD keywords are compared, so long JDs cost no more than short ones
+    jd_weights = keyword_selection.select_jd_keywords(normalization.extract_keywords(jd_text))
+    norm_jd = list(jd_weights)
     
     progress = state["progress"] + ["Texts Normalized"]
     return {
-        "normalized_resume": state["resume_text"],
+        "normalized_resume": norm_resume,
         "normalized_jd": norm_jd,
+        "jd_weights": jd_weights,
         "progress": progress
     }
 
 def run_comparisons(state: GraphState) -> dict:
-    """Runs all three comparison methods."""
+    """Runs the keyword and embedding comparisons needed for the score."""
     print("---NODE: RUNNING COMPARISONS---")
     # Hard comparison uses normalized text
+    jd_weights = state.get("jd_weights")
     hard_analysis = comparison.hard_compare(
-        state["normalized_resume"], state["normalized_jd"]
+        state["normalized_resume"], state["normalized_jd"], jd_weights
     )
     
-    # Soft and embedding comparisons use original text for better context
-    soft_analysis = comparison.soft_compare_langchain(
-        state["normalized_resume"], state["normalized_jd"]
-    )
-    embedding_score = comparison.get_embedding_fit_score(
-        state["resume_text"], state["job_description"]
-    )
+    # If the embedding model stays unavailable the component is marked as
+    # degraded instead of contributing a made-up score.
+    degraded = list(state.get("degraded") or [])
+    try:
+        # Keyword lists rather than whole documents, so identical keywords
+        # can be shared across concurrent analyses by the embedding dispatcher.
+        embedding_score = comparison.get_embedding_fit_score(
+            sorted(set(state["normalized_resume"])), sorted(set(state["normalized_jd"])), jd_weights
+        )
+    except ModelUnavailableError as e:
+        print(f"Embedding score unavailable: {e}")
+        embedding_score = None
+        degraded.append("embedding_score")
 
     progress = state["progress"] + ["Comparisons Complete"]
     return {
         "hard_analysis": hard_analysis,
-        "soft_analysis": soft_analysis,
         "embedding_score": embedding_score,
+        "degraded": degraded,
         "progress": progress
     }
 
+def soft_compare(state: GraphState) -> dict:
+    """Runs the LLM semantic comparison (full mode only)."""
+    print("---NODE: RUNNING SOFT COMPARISON---")
+    degraded = list(state.get("degraded") or [])
+    # Soft comparison uses the original text for better context.
+    try:
+        soft_analysis = comparison.soft_compare_langchain(
+            state["resume_text"], state["job_description"]
+        )
+    except ModelUnavailableError as e:
+        print(f"Soft comparison unavailable: {e}")
+        soft_analysis = ""
+        degraded.append("soft_analysis")
+
+    progress = state["progress"] + ["Soft Comparison Complete"]
+    return {
+        "soft_analysis": soft_analysis,
+        "degraded": degraded,
+        "progress": progress
+    }
+
+def _final_score(state: GraphState) -> int:
+    """Weighted average of the embedding and keyword scores."""
+    embedding_score = state["embedding_score"]
+    hard_score = state["hard_analysis"]["score"]
+    # Fall back to the keyword score alone when the embedding score could not
+    # be computed.
+    if embedding_score is None:
+        return int(hard_score)
+    return int(0.65 * embedding_score + 0.35 * hard_score)
+
+def score_results(state: GraphState) -> dict:
+    """Computes the final score and verdict without any generative calls (score mode)."""
+    print("---NODE: SCORING RESULTS---")
+    final_score = _final_score(state)
+    progress = state["progress"] + ["Scoring Complete"]
+    return {
+        "final_score": final_score,
+        "final_verdict": comparison.verdict_for_score(final_score),
+        "final_suggestions": None,
+        "degraded": list(state.get("degraded") or []),
+        "progress": progress,
+        "hard_analysis": state["hard_analysis"],
+    }
+
 def aggregate_results(state: GraphState) -> dict:
     """Aggregates scores and generates the final verdict and suggestions."""
     print("---NODE: AGGREGATING RESULTS---")
-    embedding_score = state["embedding_score"]
-    hard_score = state["hard_analysis"]["score"]
+    degraded = list(state.get("degraded") or [])
+    final_score = _final_score(state)
 
-    # Simple weighted average for final score
-    final_score = int(0.65 * embedding_score + 0.35 * hard_score)
+    # With lazy suggestions only the inputs are kept; the suggestions are
+    # generated the first time the stored evaluation is read.
+    if state.get("lazy_suggestions"):
+        progress = state["progress"] + ["Aggregation Complete"]
+        return {
+            "final_score": final_score,
+            "final_verdict": comparison.verdict_for_score(final_score),
+            "final_suggestions": None,
+            "suggestion_inputs": {
+                "score": final_score,
+                "missing_keywords": state["hard_analysis"]["missing_keywords"],
+                "soft_analysis": state["soft_analysis"],
+            },
+            "degraded": degraded,
+            "progress": progress,
+            "hard_analysis": state["hard_analysis"],
+        }
     
-    final_result = comparison.get_final_verdict_and_suggestions(
-        score=final_score,
-        hard_analysis=state["hard_analysis"],
-        soft_analysis=state["soft_analysis"]
-    )
+    try:
+        final_result = comparison.get_final_verdict_and_suggestions(
+            score=final_score,
+            hard_analysis=state["hard_analysis"],
+            soft_analysis=state["soft_analysis"]
+        )
+    except ModelUnavailableError as e:
+        print(f"Suggestions unavailable: {e}")
+        final_result = {"verdict": comparison.verdict_for_score(final_score), "suggestions": None}
+        degraded.append("suggestions")
     print(final_result)
     progress = state["progress"] + ["Aggregation Complete"]
     return {
         "final_score": final_score,
         "final_verdict": final_result["verdict"],
         "final_suggestions": final_result["suggestions"],
+        "degraded": degraded,
         "progress": progress,
         "hard_analysis": state["hard_analysis"],
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,212 @@
+# graph/singleflight.py
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional
+
+from core import cache, metrics, profiling
+from graph.checkpointing import thread_id_for
+from services import cancellation
+
+
+def analysis_key(resume_sha256: str, job_description: str, mode: str, lazy_suggestions: bool = False) -> tuple:
+    """Identifies analyses that produce the same result."""
+    jd_sha256 = hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+    return (resume_sha256, jd_sha256, mode, lazy_suggestions)
+
+
+class ResultCache:
+    """
+    Keeps the update events of finished analyses in the shared cache, so an
+    identical analysis in any worker process replays them instead of running.
+
+    `version` returns a value folded into every key (e.g. the saved job
+    descriptions' fingerprint, which the JD keyword weights depend on), so
+    results computed against older inputs are not served.
+    """
+
+    def __init__(self, ttl_seconds: float, version: Optional[Callable[[], Any]] = None):
+        self.ttl_seconds = ttl_seconds
+        self._version = version
+
+    def _key(self, key: Hashable) -> str:
+        return json.dumps([list(key), self._version() if self._version else None])
+
+    def get(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        return cache.shared.get_json("results", self._key(key))
+
+    def put(self, key: Hashable, events: List[Dict[str, Any]]) -> None:
+        # Degraded results would outlive the outage that caused them
+        for event in events:
+            for node_output in event.values():
+                if (node_output or {}).get("degraded"):
+                    return
+        try:
+            cache.shared.set_json("results", self._key(key), events, self.ttl_seconds)
+        except TypeError as e:
+            print(f"Analysis result not cacheable: {e}")
+
+
+class _Flight:
+    """One shared graph execution and the update events it has produced so far."""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+        self.token = cancellation.CancelToken()
+        self.subscribers = 0
+
+
+class GraphSingleFlight:
+    """
+    Coalesces identical in-flight graph runs.
+
+    The first caller for a key starts the graph in a background task; callers
+    arriving while it runs subscribe to the same execution and receive every
+    update event from the start. The flight is forgotten once it finishes, so
+    this deduplicates concurrent work on its own; with `results` (a
+    ResultCache), finished runs are also replayed to later identical callers,
+    including those in other worker processes.
+
+    When every subscriber has gone away before the run finishes (e.g. all SSE
+    clients disconnected), the run is cancelled along with its model calls.
+
+    `graph` is a factory returning the compiled workflow, so it can be built
+    lazily. With `checkpointed_graph` (a factory for the workflow compiled with a
+    checkpointer), each key gets its own checkpoint thread. A run whose previous
+    attempt failed or was cancelled after text extraction resumes from the last
+    completed node instead of starting over.
+    """
+
+    def __init__(self, graph: Callable[[], Any], checkpointed_graph: Optional[Callable[[], Any]] = None, results: Optional[ResultCache] = None):
+        self._graph = graph
+        self._checkpointed_graph = checkpointed_graph
+        self._results = results
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def _prepare(self, key: Hashable, state: dict):
+        """Picks the graph, run config and input, resuming from a checkpoint if one is left."""
+        if self._checkpointed_graph is None:
+            return self._graph(), None, state
+        graph = self._checkpointed_graph()
+        config = {"configurable": {"thread_id": thread_id_for(key)}}
+        snapshot = await graph.aget_state(config)
+        # The upload bytes aren't checkpointed, so only resume past extraction
+        if snapshot.next and "extract_text" not in snapshot.next:
+            print(f"Resuming analysis from checkpoint before {', '.join(snapshot.next)}")
+            metrics.increment("analyses_resumed")
+            return graph, config, None
+        if snapshot.next:
+            await graph.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+        return graph, config, state
+
+    async def _run(self, key: Hashable, flight: _Flight, state: dict) -> None:
+        # Node threads inherit this context, so model calls see the token
+        cancellation.current_token.set(flight.token)
+        profile = profiling.start_analysis(f"{key[2]}:{key[0][:12]}" if isinstance(key, tuple) else str(key))
+        profiling.current_profile.set(profile)
+        try:
+            graph, config, graph_input = await self._prepare(key, state)
+            async for event in graph.astream(graph_input, config):
+                async with flight.changed:
+                    flight.events.append(event)
+                    flight.changed.notify_all()
+            if config is not None:
+                # A finished run has nothing left to resume
+                await graph.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+            if self._results is not None:
+                await asyncio.to_thread(self._results.put, key, flight.events)
+        except BaseException as e:
+            flight.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            profiling.finish_analysis(profile)
+            async with flight.changed:
+                flight.done = True
+                flight.changed.notify_all()
+
+    def _finish(self, key: Hashable, flight: _Flight, cleanup: Optional[Callable[[], None]]) -> None:
+        # Runs as a task callback, so it also fires for a task cancelled before it started
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if cleanup is not None:
+            cleanup()
+
+    def _join(self, key: Hashable, state: dict, cleanup: Optional[Callable[[], None]]) -> _Flight:
+        flight = self._flights.get(key)
+        if flight is not None:
+            # The running flight has its own copy of the input
+            print("Joining identical in-flight analysis")
+            if cleanup is not None:
+                cleanup()
+            return flight
+        flight = _Flight()
+        self._flights[key] = flight
+        flight.task = asyncio.create_task(self._run(key, flight, state))
+        flight.task.add_done_callback(lambda _: self._finish(key, flight, cleanup))
+        return flight
+
+    async def stream(self, key: Hashable, state: dict, cleanup: Optional[Callable[[], None]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields the graph's update events, like `graph.astream(state)`.
+
+        `cleanup` releases the caller's input (e.g. a spooled upload); it runs
+        when the shared execution no longer needs it.
+        """
+        if self._results is not None and key not in self._flights:
+            cached = await asyncio.to_thread(self._results.get, key)
+            if cached is not None:
+                metrics.increment("analyses_from_cache")
+                if cleanup is not None:
+                    cleanup()
+                for event in cached:
+                    yield event
+                return
+        flight = self._join(key, state, cleanup)
+        flight.subscribers += 1
+        index = 0
+        completed = False
+        try:
+            while True:
+                async with flight.changed:
+                    while index >= len(flight.events) and not flight.done:
+                        await flight.changed.wait()
+                    pending = flight.events[index:]
+                    finished = flight.done
+                for event in pending:
+                    yield event
+                index += len(pending)
+                if finished and index >= len(flight.events):
+                    break
+            completed = True
+        finally:
+            flight.subscribers -= 1
+            if not completed and flight.subscribers == 0 and not flight.done:
+                self._cancel(key, flight)
+        if flight.error is not None:
+            raise flight.error
+
+    def _cancel(self, key: Hashable, flight: _Flight) -> None:
+        """Stops a run nobody is waiting for: no new nodes and no new model calls."""
+        print("All subscribers left; cancelling in-flight analysis")
+        metrics.increment("analyses_cancelled")
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        flight.token.set()
+        if flight.task is not None:
+            flight.task.cancel()
+
+    async def invoke(self, key: Hashable, state: dict, cleanup: Optional[Callable[[], None]] = None) -> dict:
+        """Runs (or joins) the graph and returns the final state, like `graph.ainvoke(state)`."""
+        final_state = dict(state)
+        async for event in self.stream(key, state, cleanup):
+            for node_output in event.values():
+                final_state.update(node_output or {})
+        return final_state
@@ -1,5 +1,5 @@
 # graph/state.py
-from typing import TypedDict, List, Dict, Any
+from typing import TypedDict, List, Dict, Any, Optional
 from fastapi import UploadFile
 
 class GraphState(TypedDict):
@@ -7,32 +7,44 @@ class GraphState(TypedDict):
     Represents the state of our graph.
 
     Attributes:
-        resume_file_content: The raw content of the resume file.
+        resume_file_content: The raw content of the resume file (cleared after extraction).
+        resume_path: Path of the spooled resume file, used instead of the raw content.
         file_format: The format of the file ('pdf', 'txt', 'docx').
         job_description: The job description text.
+        mode: 'full' runs every step, 'score' skips the generative LLM calls.
+        lazy_suggestions: Defer suggestion generation until the evaluation is read.
         resume_text: Extracted text from the resume.
-        normalized_resume: Normalized resume text.
-        normalized_jd: Normalized job description text.
+        normalized_resume: Normalized resume keywords.
+        normalized_jd: The selected job description keywords, highest weight first.
+        jd_weights: TF-IDF weights of the selected job description keywords.
         hard_analysis: Results from keyword comparison.
         soft_analysis: Results from semantic LLM analysis.
         embedding_score: Score from embedding similarity.
         final_score: The final aggregated score.
         final_verdict: The final verdict (High, Medium, Low).
         final_suggestions: Final improvement suggestions.
+        suggestion_inputs: Inputs kept for generating suggestions later (lazy mode).
+        degraded: Components whose model calls failed and were left out of the result.
         progress: A list to track completed steps.
     """
-    resume_file_content: bytes
+    resume_file_content: Optional[bytes]
+    resume_path: Optional[str]
     file_format: str
     job_description: str
+    mode: str
+    lazy_suggestions: bool
     
     # Fields to be populated by the graph nodes
     resume_text: str
-    normalized_resume: str
-    normalized_jd: str
+    normalized_resume: List[str]
+    normalized_jd: List[str]
+    jd_weights: Dict[str, float]
     hard_analysis: Dict[str, Any]
     soft_analysis: str
-    embedding_score: int
+    embedding_score: Optional[int]
     final_score: int
     final_verdict: str
-    final_suggestions: str
+    final_suggestions: Optional[str]
+    suggestion_inputs: Optional[Dict[str, Any]]
+    degraded: List[str]
     progress: List[str]
\ No newline at end of file
@@ -1,28 +1,94 @@
 # graph/workflow.py
-from langgraph.graph import StateGraph, END
+import asyncio
+from functools import lru_cache
 from graph.state import GraphState
 from graph import nodes
+from graph.singleflight import GraphSingleFlight, ResultCache
+from graph import checkpointing
+from core import db, profiling
+from core.config import settings
 
-def create_workflow():
-    """Creates the LangGraph workflow."""
+# Analysis modes: "score" stops after the keyword and embedding scores,
+# "full" also runs the LLM soft comparison and suggestions.
+ANALYSIS_MODES = ("full", "score")
+
+# Nodes whose output is the final result of a run, one per mode
+FINAL_NODES = ("aggregate_results", "score_results")
+
+
+def route_by_mode(state: GraphState) -> str:
+    """Picks the branch after the comparisons based on the analysis mode."""
+    return "score" if state.get("mode") == "score" else "full"
+
+
+def create_workflow(checkpointer=None):
+    """
+    Creates the LangGraph workflow. With a checkpointer, state is saved after
+    every node so a failed run can resume where it stopped.
+    """
+    from langgraph.graph import StateGraph, END
     workflow = StateGraph(GraphState)
 
+    def add_node(name, node):
+        # Nodes are only wrapped for memory profiling when it is enabled
+        workflow.add_node(name, profiling.profiled(name, node) if settings.PROFILING_ENABLED else node)
+
     # Define the nodes
-    workflow.add_node("extract_text", nodes.extract_text)
-    workflow.add_node("normalize_texts", nodes.normalize_texts)
-    workflow.add_node("run_comparisons", nodes.run_comparisons)
-    workflow.add_node("aggregate_results", nodes.aggregate_results)
+    add_node("extract_text", nodes.extract_text)
+    add_node("normalize_texts", nodes.normalize_texts)
+    add_node("run_comparisons", nodes.run_comparisons)
+    add_node("soft_compare", nodes.soft_compare)
+    add_node("aggregate_results", nodes.aggregate_results)
+    add_node("score_results", nodes.score_results)
 
     # Define the edges (the sequence of steps)
     workflow.set_entry_point("extract_text")
     workflow.add_edge("extract_text", "normalize_texts")
     workflow.add_edge("normalize_texts", "run_comparisons")
-    workflow.add_edge("run_comparisons", "aggregate_results")
+    workflow.add_conditional_edges(
+        "run_comparisons",
+        route_by_mode,
+        {"full": "soft_compare", "score": "score_results"},
+    )
+    workflow.add_edge("soft_compare", "aggregate_results")
     workflow.add_edge("aggregate_results", END)
+    workflow.add_edge("score_results", END)
 
     # Compile the workflow into a runnable app
-    app = workflow.compile()
+    app = workflow.compile(checkpointer=checkpointer)
+    return app
+
+@lru_cache(maxsize=1)
+def get_graph_app():
+    """The single compiled workflow used by the API, built on first use."""
+    return create_workflow()
+
+
+def __getattr__(name: str):
+    # `graph_app` is compiled lazily so importing this module stays cheap
+    if name == "graph_app":
+        return get_graph_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_checkpointed_apps: dict = {}
+
+
+def get_checkpointed_app():
+    """
+    The workflow compiled with the SQLite checkpointer. Created on first use in
+    each event loop, because the saver binds to the loop it was created in.
+    """
+    loop = asyncio.get_running_loop()
+    app = _checkpointed_apps.get(loop)
+    if app is None:
+        _checkpointed_apps.clear()
+        app = _checkpointed_apps[loop] = create_workflow(checkpointer=checkpointing.open_checkpointer())
     return app
 
-# Create a single instance of the app to be used by the API
-graph_app = create_workflow()
\ No newline at end of file
+# Identical concurrent analyses share one execution of graph_app; finished ones
+# are replayed from the shared cache until a job description changes
+graph_flights = GraphSingleFlight(
+    get_graph_app,
+    checkpointed_graph=get_checkpointed_app if settings.CHECKPOINT_ENABLED else None,
+    results=ResultCache(settings.RESULT_CACHE_TTL_SECONDS, version=db.job_descriptions_fingerprint) if settings.RESULT_CACHE_TTL_SECONDS > 0 else None,
+)
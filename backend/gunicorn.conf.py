@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+# Multi-process serving: gunicorn -c gunicorn.conf.py main:app
+import gc
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master; workers are forked from it with the app
+# (and everything warm_shared() loads) already in memory
+preload_app = True
+
+# Long analyses hold a request open while the model answers
+timeout = 300
+graceful_timeout = 30
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker is forked
+    import main
+    if main.settings.STARTUP_WARMUP:
+        main.warm_shared()
+    # Keep the collector away from everything loaded so far: a collection in a
+    # worker would otherwise write to, and so un-share, every page it visits
+    gc.freeze()
@@ -1,15 +1,110 @@
 # main.py
-from fastapi import FastAPI
-from api.v1.routers import analysis as analysis_v1
-from fastapi.middleware.cors import CORSMiddleware
+from core import startup
+
+from contextlib import asynccontextmanager
+import asyncio
+
+with startup.phase("import app"):
+    from fastapi import FastAPI
+    from api.v1.routers import analysis as analysis_v1
+    from fastapi.middleware.cors import CORSMiddleware
+    from core.config import settings
+    from core.request_limits import RequestSizeLimitMiddleware
+
+
+# Set once the immutable state has been loaded, e.g. by the gunicorn master
+# before forking the workers (see gunicorn.conf.py)
+_shared_state_loaded = False
+
+
+def _run_steps(steps) -> None:
+    # Each step is timed for the startup report; a failing step is logged and
+    # left to load lazily on first use
+    for name, step in steps:
+        with startup.phase(name):
+            try:
+                step()
+            except Exception as e:
+                print(f"Warmup step '{name}' failed: {e}")
+
+
+def warm_shared() -> None:
+    """
+    Loads the state that never changes once loaded: NLTK data, the skill
+    dictionary, the heavy libraries and the compiled graph. Safe to run before
+    forking worker processes, which then share these pages copy-on-write.
+    """
+    global _shared_state_loaded
+    from graph import workflow
+    from services import normalization, skills
+
+    def load_libraries():
+        import langchain.prompts  # noqa: F401
+        import sklearn.metrics.pairwise  # noqa: F401
+        import pdfplumber  # noqa: F401
+        import thefuzz.process  # noqa: F401
+        import rapidfuzz.process  # noqa: F401
+
+    def load_nltk():
+        normalization.ensure_nltk_data()
+        normalization.stop_words()
+        normalization.word_tokenize("warm up")
+
+    _run_steps([
+        ("nltk data", load_nltk),
+        ("skill dictionary", lambda: skills.find_skills("")),
+        ("libraries", load_libraries),
+        ("graph", workflow.get_graph_app),
+    ])
+    _shared_state_loaded = True
+
+
+def warm_worker() -> None:
+    """
+    Loads the per-process state: database connections, the JD keyword corpus
+    and the model clients, whose connections must not cross a fork.
+    """
+    from core import db
+    from services import comparison, keyword_selection
+
+    def load_model_clients():
+        comparison._chat_model()
+        comparison._embedding_model()
+
+    _run_steps([
+        ("database", db.init_db),
+        ("jd keyword corpus", keyword_selection.corpus.idf),
+        ("model clients", load_model_clients),
+    ])
+
+
+def warm_up() -> None:
+    """Loads everything the first request would otherwise pay for."""
+    if not _shared_state_loaded:
+        warm_shared()
+    warm_worker()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.STARTUP_WARMUP:
+        await asyncio.to_thread(warm_up)
+    startup.mark_ready()
+    startup.print_report()
+    yield
+
 
 app = FastAPI(
     title="Resume Analyzer API",
     description="An API to analyze resumes against job descriptions using AI.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 origins = ["*"]
 
+# Refuse oversized bodies before the form parser spools them. Added first so
+# it runs inside the CORS middleware and its 413 carries the CORS headers.
+app.add_middleware(RequestSizeLimitMiddleware, max_bytes=settings.MAX_REQUEST_BYTES)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -24,4 +119,4 @@ app.include_router(analysis_v1.router, prefix="/api/v1", tags=["Analysis"])
 @app.get("/", tags=["Root"])
 def read_root():
     """A simple health check endpoint."""
-    return {"status": "ok", "message": "Welcome to the Resume Analyzer API!"}
\ No newline at end of file
+    return {"status": "ok", "message": "Welcome to the Resume Analyzer API!"}
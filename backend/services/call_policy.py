@@ -0,0 +1,240 @@
+# services/call_policy.py
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from core.config import settings
+from services import cancellation
+
+
+class ModelUnavailableError(Exception):
+    """Raised when a model call could not be completed under the call policy."""
+
+
+class CircuitOpenError(ModelUnavailableError):
+    """Raised without calling the model while the circuit breaker is open."""
+
+
+class RateLimitTimeout(ModelUnavailableError):
+    """Raised when no rate-limit token became available in time."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Returns True for errors worth retrying: upstream rate limiting (429),
+    transient server errors and timeouts.
+    """
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        from google.api_core import exceptions as gexc
+        if isinstance(exc, (gexc.TooManyRequests, gexc.ResourceExhausted, gexc.ServiceUnavailable,
+                            gexc.InternalServerError, gexc.DeadlineExceeded)):
+            return True
+    except ImportError:
+        pass
+    # langchain-google-genai re-wraps some client errors, so fall back to the message.
+    message = str(exc)
+    return any(marker in message for marker in ("429", "500", "503", "RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED"))
+
+
+class TokenBucket:
+    """A thread-safe token bucket shared by every caller of a model."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Takes a token if one is available right now."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """Blocks until a token is available, or raises RateLimitTimeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+            if deadline is not None and time.monotonic() + wait_for > deadline:
+                raise RateLimitTimeout("Timed out waiting for a rate-limit token")
+            cancellation.sleep(wait_for)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and fails fast
+    until `reset_seconds` have passed. One trial call is then let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> bool:
+        """Raises CircuitOpenError while open. Returns True if this call is the half-open trial."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                raise CircuitOpenError("Model circuit breaker is open")
+            self._trial_in_flight = True
+            return True
+
+    def release_trial(self) -> None:
+        """Lets another trial through after one that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class CallPolicy:
+    """
+    Wraps a model call with rate limiting, retries with exponential backoff and
+    full jitter, optional hedging and a circuit breaker.
+
+    A single instance is meant to be shared by all concurrent analyses that talk
+    to the same model, so the rate limit and breaker state are global.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        burst: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        hedge_after: Optional[float],
+        breaker: CircuitBreaker,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.breaker = breaker
+        self._hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix=f"{name}-hedge") if hedge_after else None
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _hedged(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs `fn`, starting a second copy if the first is slower than `hedge_after`."""
+        primary = self._hedge_pool.submit(fn, *args, **kwargs)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        # Only hedge when it doesn't eat into the rate limit budget of other callers.
+        if not self.bucket.try_acquire():
+            return primary.result()
+        pending = {primary, self._hedge_pool.submit(fn, *args, **kwargs)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Calls `fn(*args, **kwargs)` under the policy. Raises AnalysisCancelled
+        instead of starting another attempt once the calling analysis is cancelled.
+        """
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            cancellation.raise_if_cancelled()
+            # Wait for the token first: a timed out or cancelled wait must not
+            # leave a half-open trial claimed with no call to settle it
+            self.bucket.acquire(timeout=self.backoff_max * 2)
+            trial = self.breaker.before_call()
+            try:
+                result = self._hedged(fn, *args, **kwargs) if self._hedge_pool else fn(*args, **kwargs)
+            except Exception as e:
+                last_error = e
+                if not is_retryable(e):
+                    # The upstream answered; a bad request says nothing about its health.
+                    self.breaker.record_success()
+                    break
+                # The breaker counts failed calls, not attempts, so one call
+                # exhausting its retries can't open it alone; a failed trial
+                # re-opens it right away.
+                if trial or attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    break
+                delay = self._backoff(attempt)
+                print(f"{self.name} call failed ({e}); retrying in {delay:.2f}s")
+                cancellation.sleep(delay)
+                continue
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                if trial:
+                    self.breaker.release_trial()
+        raise ModelUnavailableError(f"{self.name} call failed: {last_error}") from last_error
+
+
+def _build_policy(name: str) -> CallPolicy:
+    return CallPolicy(
+        name=name,
+        rate_per_second=settings.MODEL_RATE_PER_SECOND,
+        burst=settings.MODEL_BURST,
+        max_retries=settings.MODEL_MAX_RETRIES,
+        backoff_base=settings.MODEL_BACKOFF_BASE_SECONDS,
+        backoff_max=settings.MODEL_BACKOFF_MAX_SECONDS,
+        hedge_after=settings.MODEL_HEDGE_AFTER_SECONDS,
+        breaker=CircuitBreaker(settings.MODEL_BREAKER_FAILURE_THRESHOLD, settings.MODEL_BREAKER_RESET_SECONDS),
+    )
+
+
+# Shared across every analysis running in this process
+chat_policy = _build_policy("chat")
+embedding_policy = _build_policy("embedding")
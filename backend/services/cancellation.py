@@ -0,0 +1,37 @@
+# services/cancellation.py
+import contextvars
+import threading
+from typing import Optional
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside a running analysis once nobody is waiting for its result."""
+
+
+class CancelToken(threading.Event):
+    """Set when the analysis that owns it has been cancelled."""
+
+
+# The token of the analysis running in the current context. LangGraph copies the
+# context into the worker threads that run sync nodes, so model calls made from
+# nodes can see it.
+current_token: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("cancel_token", default=None)
+
+
+def is_cancelled() -> bool:
+    token = current_token.get()
+    return token is not None and token.is_set()
+
+
+def raise_if_cancelled() -> None:
+    if is_cancelled():
+        raise AnalysisCancelled("Analysis was cancelled")
+
+
+def sleep(seconds: float) -> None:
+    """Sleeps like time.sleep, but wakes up and raises as soon as the analysis is cancelled."""
+    token = current_token.get()
+    if token is None:
+        threading.Event().wait(seconds)
+    elif token.wait(seconds):
+        raise AnalysisCancelled("Analysis was cancelled")
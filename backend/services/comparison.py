@@ -1,24 +1,71 @@
 # services/comparison.py
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain.prompts import PromptTemplate
-from sklearn.metrics.pairwise import cosine_similarity
+# langchain, sklearn and the fuzzy matchers (thefuzz, rapidfuzz) are imported
+# on first use (or during startup warmup) to keep importing the app cheap.
 import numpy as np
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional
 from core.config import settings
-from thefuzz import process
+from services.call_policy import chat_policy
+from services import embedding_dispatcher
 
-def hard_compare(resume_keywords: list, jd_keywords: list) -> dict:
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
+
+def _client_kwargs() -> dict:
+    """Extra client arguments, e.g. to target a local fake model server."""
+    if not settings.GOOGLE_API_ENDPOINT:
+        return {}
+    return {"client_options": {"api_endpoint": settings.GOOGLE_API_ENDPOINT}, "transport": "rest"}
+
+
+@lru_cache(maxsize=1)
+def _chat_model() -> "ChatGoogleGenerativeAI":
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    # Retries are handled by the call policy, so the client makes a single attempt.
+    # One client per process; it is safe to share between threads.
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash", google_api_key=settings.GOOGLE_API_KEY, max_retries=1, **_client_kwargs()
+    )
+
+
+EMBEDDING_MODEL = "gemini-embedding-001"
+
+
+@lru_cache(maxsize=1)
+def _embedding_model() -> "GoogleGenerativeAIEmbeddings":
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(
+        model=EMBEDDING_MODEL, google_api_key=settings.GOOGLE_API_KEY, **_client_kwargs()
+    )
+
+
+# A similarity score of 85+ is generally a good match for technical terms.
+# This value can be tuned as needed.
+SIMILARITY_THRESHOLD = 85
+
+
+def is_fuzzy_matchable(keyword: str) -> bool:
+    """
+    Whether a keyword can be fuzzy matched. Fuzzy matching strips symbols, so
+    'c++' and 'c#' would both match 'c'; such keywords must match exactly.
+    """
+    from rapidfuzz import utils as fuzz_utils
+    return fuzz_utils.default_process(keyword) == keyword
+
+
+def hard_compare(resume_keywords: list, jd_keywords: list, weights: Optional[Dict[str, float]] = None) -> dict:
     """
     Hard compares the resume and job description using fuzzy keyword matching.
+    With `weights` (keyword -> weight, see keyword_selection), the score is the
+    weighted share of JD keywords found instead of the plain share.
     
     Returns:
         A dictionary with a score and missing keywords.
     """
+    from thefuzz import process
     print("Performing fuzzy hard comparison...")
 
-    # A similarity score of 85+ is generally a good match for technical terms.
-    # This value can be tuned as needed.
-    SIMILARITY_THRESHOLD = 85
-
     # 1. Tokenize the inputs into unique sets of keywords.
     # The jd_text and resume_text are expected to be pre-processed,
     # space-separated strings of keywords from the normalization step.
@@ -31,9 +78,17 @@ def hard_compare(resume_keywords: list, jd_keywords: list) -> dict:
 
     found_keywords = set()
     missing_keywords = set()
+    resume_set = set(resume_keywords)
 
     # 2. Iterate through each required keyword from the job description.
     for keyword in jd_keywords:
+        # Exact matches (e.g. canonical skill phrases) need no fuzzy search
+        if keyword in resume_set:
+            found_keywords.add(keyword)
+            continue
+        if not is_fuzzy_matchable(keyword):
+            missing_keywords.add(keyword)
+            continue
         # 3. Find the best fuzzy match for the keyword within the resume.
         # process.extractOne returns a tuple: (best_match, score)
         best_match = process.extractOne(keyword, resume_keywords)
@@ -45,7 +100,11 @@ def hard_compare(resume_keywords: list, jd_keywords: list) -> dict:
             missing_keywords.add(keyword)
 
     # 5. Calculate the final score based on found keywords.
-    score = (len(found_keywords) / len(jd_keywords)) * 100 if jd_keywords else 0
+    if weights:
+        total = sum(weights.get(k, 0.0) for k in set(jd_keywords))
+        score = sum(weights.get(k, 0.0) for k in found_keywords) / total * 100 if total else 0
+    else:
+        score = (len(found_keywords) / len(jd_keywords)) * 100 if jd_keywords else 0
     
     print(f"Found keywords (fuzzy): {found_keywords}")
     print(f"Missing keywords (fuzzy): {missing_keywords}")
@@ -62,9 +121,10 @@ def soft_compare_langchain(resume_text: str, jd_text: str) -> str:
     Returns:
         A string containing the model's analysis.
     """
+    from langchain.prompts import PromptTemplate
     print("Performing soft comparison with LangChain...")
     # 1. Initialize the model
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=settings.GOOGLE_API_KEY)
+    llm = _chat_model()
     
     # 2. Create a prompt template
     template = """
@@ -81,78 +141,82 @@ def soft_compare_langchain(resume_text: str, jd_text: str) -> str:
     """
     prompt = PromptTemplate.from_template(template)
     
-    # 3. Create the chain and invoke
+    # 3. Create the chain and invoke it under the shared call policy
     chain = prompt | llm
-    result = chain.invoke({"job_description": jd_text, "resume": resume_text})
+    result = chat_policy.call(chain.invoke, {"job_description": jd_text, "resume": resume_text})
     
     return result.content
 
-def get_embedding_fit_score(resume_keywords: list[str], jd_keywords: list[str]) -> int:
+def get_embedding_fit_score(resume_keywords: list[str], jd_keywords: list[str], weights: Optional[Dict[str, float]] = None) -> int:
     """
     Calculates a "strict" fit score by ensuring each keyword in the job description
-    has a semantically similar counterpart in the resume. This version iterates
-    to stay within free-tier API limits and applies a penalty to non-perfect
-    matches to "widen the gap" between scores.
+    has a semantically similar counterpart in the resume, and applies a penalty
+    to non-perfect matches to "widen the gap" between scores. With `weights`,
+    each JD keyword counts in proportion to its weight.
+
+    Raises ModelUnavailableError if the embedding model cannot be reached.
     """
+    from sklearn.metrics.pairwise import cosine_similarity
     print("Calculating strict embedding fit score (widened gap)...")
     
     if not jd_keywords or not resume_keywords:
         return 0
 
-    try:
-        # 1. Initialize the embedding model with the correct API identifier.
-        embeddings = GoogleGenerativeAIEmbeddings(model="gemini-embedding-001", google_api_key=settings.GOOGLE_API_KEY)
-        
-        # 2. Use embed_query in a loop to process keywords one by one.
-        jd_embeddings = embeddings.embed_document(jd_keywords)
-        resume_embeddings = embeddings.embed_document(resume_keywords)
-
-        jd_vecs = np.array(jd_embeddings)
-        resume_vecs = np.array(resume_embeddings)
-
-        # 3. For each JD keyword, find its best match and apply a penalty.
-        # This avoids creating the full similarity matrix at once.
-        penalized_scores = []
-        for jd_vec in jd_vecs:
-            # Compare one JD vector against all resume vectors
-            similarities = cosine_similarity(jd_vec.reshape(1, -1), resume_vecs)[0]
-            
-            # Find the best match score for the current JD keyword
-            best_match_score = np.max(similarities)
-            
-            # --- "WIDEN THE GAP" ---
-            # Apply an exponential penalty. Squaring the score (power of 2)
-            # punishes scores below 1.0 more heavily.
-            # e.g., a 0.9 similarity becomes 0.81, but a 0.7 similarity drops to 0.49.
-            # A higher exponent (e.g., 3) would be even stricter.
-            penalized_score = best_match_score ** 2
-            penalized_scores.append(penalized_score)
-
-        # 4. The final score is the average of these penalized best-match scores.
-        average_penalized_similarity = np.mean(penalized_scores)
+    # 1. Embed both keyword lists through the shared dispatcher, which batches
+    # them with the keywords of other in-flight analyses into one request.
+    # Failures surface as ModelUnavailableError so callers can mark the result
+    # as degraded rather than reporting a score of 0.
+    vectors = embedding_dispatcher.dispatcher.embed(list(jd_keywords) + list(resume_keywords))
+    jd_embeddings = vectors[:len(jd_keywords)]
+    resume_embeddings = vectors[len(jd_keywords):]
+
+    jd_vecs = np.array(jd_embeddings)
+    resume_vecs = np.array(resume_embeddings)
+
+    # 2. For each JD keyword, find its best match and apply a penalty.
+    # This avoids creating the full similarity matrix at once.
+    penalized_scores = []
+    for jd_vec in jd_vecs:
+        # Compare one JD vector against all resume vectors
+        similarities = cosine_similarity(jd_vec.reshape(1, -1), resume_vecs)[0]
         
-        # 5. Scale the score to the 0-100 range.
-        # Since cosine similarity for these embeddings is in the [0, 1] range,
-        # we can directly scale the result by 100.
-        score = int(average_penalized_similarity * 100)
+        # Find the best match score for the current JD keyword
+        best_match_score = np.max(similarities)
         
-        print(f"Strict embedding score (widened): {score}")
-        return score
-        
-    except Exception as e:
-        print(f"Error calculating embedding fit score: {e}")
-        # Return a default score of 0 if the embedding service fails
-        return 0
+        # --- "WIDEN THE GAP" ---
+        # Apply an exponential penalty. Squaring the score (power of 2)
+        # punishes scores below 1.0 more heavily.
+        # e.g., a 0.9 similarity becomes 0.81, but a 0.7 similarity drops to 0.49.
+        # A higher exponent (e.g., 3) would be even stricter.
+        penalized_score = best_match_score ** 2
+        penalized_scores.append(penalized_score)
+
+    # 3. The final score is the (weighted) average of these penalized best-match scores.
+    keyword_weights = [weights.get(k, 0.0) for k in jd_keywords] if weights else None
+    if keyword_weights and sum(keyword_weights) > 0:
+        average_penalized_similarity = np.average(penalized_scores, weights=keyword_weights)
+    else:
+        average_penalized_similarity = np.mean(penalized_scores)
+    
+    # 4. Scale the score to the 0-100 range.
+    # Since cosine similarity for these embeddings is in the [0, 1] range,
+    # we can directly scale the result by 100.
+    score = int(average_penalized_similarity * 100)
+    
+    print(f"Strict embedding score (widened): {score}")
+    return score
+
+def verdict_for_score(score: int) -> str:
+    """Maps a 0-100 relevance score to the High/Medium/Low verdict category."""
+    if score >= 75:
+        return "High"
+    elif score >= 50:
+        return "Medium"
+    return "Low"
 
 def get_final_verdict_and_suggestions(score: int, hard_analysis: dict, soft_analysis: str) -> dict:
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=settings.GOOGLE_API_KEY)
-        
-    if score >= 75: 
-        verdict_category = "High"
-    elif score >= 50: 
-        verdict_category = "Medium"
-    else: 
-        verdict_category = "Low"
+    llm = _chat_model()
+    verdict_category = verdict_for_score(score)
 
     prompt = f"""
     Given the following analysis of a resume against a job description:
@@ -164,5 +228,5 @@ def get_final_verdict_and_suggestions(score: int, hard_analysis: dict, soft_anal
     SUGGESTIONS:
     """
     
-    suggestions = llm.invoke(prompt).content
+    suggestions = chat_policy.call(llm.invoke, prompt).content
     return {"verdict": verdict_category, "suggestions": suggestions}
\ No newline at end of file
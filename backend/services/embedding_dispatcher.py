@@ -0,0 +1,140 @@
+# services/embedding_dispatcher.py
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from core import cache
+from core.config import settings
+from services import cancellation
+
+
+class EmbeddingDispatcher:
+    """
+    Micro-batches embedding requests across concurrent analyses.
+
+    Callers block in `embed()` while their texts wait in a shared queue. A
+    background thread flushes the queue as one embeddings request once it holds
+    `max_batch` texts or the oldest text has waited `max_wait` seconds. Identical
+    strings, whether queued or already in flight, share one result.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], List[List[float]]], max_batch: int, max_wait: float, max_concurrent_batches: int = 4):
+        self._embed_fn = embed_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._queued: Dict[str, Future] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._oldest = 0.0
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="embed-batch")
+        self._worker = None
+        self.requests_sent = 0
+        self.texts_sent = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="embed-dispatcher", daemon=True)
+            self._worker.start()
+
+    def submit(self, texts: List[str]) -> Dict[str, Future]:
+        """Queues texts for embedding and returns a future per unique text."""
+        futures: Dict[str, Future] = {}
+        with self._cond:
+            self._ensure_worker()
+            for text in texts:
+                if text in futures:
+                    continue
+                future = self._queued.get(text) or self._in_flight.get(text)
+                if future is None:
+                    if not self._queued:
+                        self._oldest = time.monotonic()
+                    future = Future()
+                    self._queued[text] = future
+                futures[text] = future
+            self._cond.notify()
+        return futures
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds texts, returning vectors in input order. Re-raises batch errors,
+        and stops waiting if the calling analysis is cancelled.
+        """
+        futures = self.submit(texts)
+        pending = set(futures.values())
+        while pending:
+            _, pending = wait(pending, timeout=0.1)
+            if pending:
+                cancellation.raise_if_cancelled()
+        return [futures[text].result() for text in texts]
+
+    def _take_batch(self) -> Dict[str, Future]:
+        """Waits until a batch is due and moves it from queued to in flight."""
+        with self._cond:
+            while True:
+                if self._queued:
+                    remaining = self._oldest + self.max_wait - time.monotonic()
+                    if len(self._queued) >= self.max_batch or remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+            batch = {}
+            for text in list(self._queued)[:self.max_batch]:
+                batch[text] = self._queued.pop(text)
+            self._in_flight.update(batch)
+            self._oldest = time.monotonic()
+            return batch
+
+    def _send(self, batch: Dict[str, Future]) -> None:
+        texts = list(batch)
+        try:
+            vectors = self._embed_fn(texts)
+        except BaseException as e:
+            for future in batch.values():
+                future.set_exception(e)
+        else:
+            for text, vector in zip(texts, vectors):
+                batch[text].set_result(vector)
+        finally:
+            with self._cond:
+                for text in texts:
+                    self._in_flight.pop(text, None)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            self.requests_sent += 1
+            self.texts_sent += len(batch)
+            self._pool.submit(self._send, batch)
+
+
+def _embed_documents(texts: List[str]) -> List[List[float]]:
+    """
+    Embeds a batch, serving texts from the shared embedding cache where
+    possible. Vectors go through float32 either way, so cached and fresh
+    results are identical.
+    """
+    # Imported here to avoid a circular import with services.comparison.
+    from services.comparison import _embedding_model, EMBEDDING_MODEL
+    from services.call_policy import embedding_policy
+    namespace = f"embeddings:{EMBEDDING_MODEL}"
+    cached = cache.shared.get_many(namespace, texts) if settings.EMBEDDING_CACHE_ENABLED else {}
+    missing = [text for text in texts if text not in cached]
+    if missing:
+        vectors = embedding_policy.call(_embedding_model().embed_documents, missing, batch_size=len(missing))
+        fresh = {text: np.asarray(vector, dtype=np.float32).tobytes() for text, vector in zip(missing, vectors)}
+        if settings.EMBEDDING_CACHE_ENABLED:
+            cache.shared.set_many(namespace, fresh)
+        cached.update(fresh)
+    return [np.frombuffer(cached[text], dtype=np.float32).tolist() for text in texts]
+
+
+# Shared by every analysis running in this process
+dispatcher = EmbeddingDispatcher(
+    _embed_documents,
+    max_batch=settings.EMBED_BATCH_MAX_ITEMS,
+    max_wait=settings.EMBED_BATCH_WAIT_MS / 1000,
+)
@@ -0,0 +1,94 @@
+# services/exports.py
+import csv
+import io
+import json
+from typing import Iterable, Iterator, List
+
+# Columns of an evaluation export, in order
+FIELDS = ["id", "created_at", "filename", "job_id", "relevance_score", "verdict", "missing_keywords", "degraded", "suggestions", "error"]
+
+
+def export_row(row) -> dict:
+    """Flattens a saved evaluation (see db.iter_evaluations) into an export row."""
+    try:
+        result = json.loads(row["result_json"]) if row["result_json"] else {}
+    except ValueError:
+        result = {}
+    # Failed analyses store {"status": "error", "detail": ...} instead of a result
+    failed = result.get("status") == "error"
+    return {
+        "id": row["id"],
+        "created_at": row["created_at"],
+        "filename": row["filename"],
+        "job_id": row["job_id"],
+        "relevance_score": row["relevance_score"],
+        "verdict": row["verdict"],
+        "missing_keywords": None if failed else result.get("missing_keywords") or [],
+        "degraded": None if failed else result.get("degraded") or [],
+        "suggestions": result.get("suggestions"),
+        "error": result.get("detail") if failed else None,
+    }
+
+
+def iter_csv(chunks: Iterable[List]) -> Iterator[bytes]:
+    """Encodes chunks of evaluation rows as CSV, one piece per chunk after the header."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    for rows in chunks:
+        for row in rows:
+            data = export_row(row)
+            for column in ("missing_keywords", "degraded"):
+                data[column] = ";".join(data[column] or [])
+            writer.writerow(data)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """A write-only file that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # The Parquet footer records absolute offsets, so count every byte ever written
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def iter_parquet(chunks: Iterable[List]) -> Iterator[bytes]:
+    """
+    Encodes chunks of evaluation rows as one Parquet file, one row group per
+    chunk, yielding the bytes as each row group is written. The list columns
+    (missing_keywords, degraded) stay lists. Requires pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()), ("created_at", pa.string()), ("filename", pa.string()), ("job_id", pa.int64()),
+        ("relevance_score", pa.float64()), ("verdict", pa.string()), ("missing_keywords", pa.list_(pa.string())),
+        ("degraded", pa.list_(pa.string())), ("suggestions", pa.string()), ("error", pa.string()),
+    ])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist([export_row(row) for row in rows], schema=schema))
+            yield sink.drain()
+    yield sink.drain()
@@ -1,19 +1,204 @@
 # services/extraction.py
-import pdfplumber
-import docx2txt
+import codecs
 import io
+import mmap
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Optional, Union
+
+# Number of leading bytes needed by sniff_format; PDF readers look for the
+# header this far in
+SNIFF_BYTES = 1024
+
+# The main body part of a DOCX package
+DOCX_DOCUMENT = "word/document.xml"
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Byte order marks, longest first so UTF-32 isn't mistaken for UTF-16
+_BOMS = (
+    (b"\xff\xfe\x00\x00", "utf-32"),
+    (b"\x00\x00\xfe\xff", "utf-32"),
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe", "utf-16"),
+    (b"\xfe\xff", "utf-16"),
+)
+
+def _utf16_without_bom(header: bytes) -> Optional[str]:
+    """Spots BOM-less UTF-16 text by its NUL bytes all falling on one side of each pair."""
+    sample = header[:len(header) // 2 * 2]
+    if len(sample) < 4:
+        return None
+    even_nuls = sample[0::2].count(0)
+    odd_nuls = sample[1::2].count(0)
+    pairs = len(sample) // 2
+    if odd_nuls >= pairs * 0.3 and even_nuls == 0:
+        return "utf-16-le"
+    if even_nuls >= pairs * 0.3 and odd_nuls == 0:
+        return "utf-16-be"
+    return None
+
+def _looks_like_text(data: bytes) -> bool:
+    # Plain text has no NUL bytes and few control characters
+    control = sum(1 for b in data if b < 32 and b not in (9, 10, 12, 13))
+    return b"\x00" not in data and control <= len(data) // 100
+
+def _is_clean_text(header: bytes) -> bool:
+    """Whether a header reads as plain text: it has a BOM, or is UTF-8 that looks like text."""
+    if header.startswith(tuple(bom for bom, _ in _BOMS)):
+        return True
+    try:
+        # Not final: the header may end inside a multi-byte character
+        codecs.getincrementaldecoder('utf-8')().decode(header, final=False)
+    except UnicodeDecodeError:
+        return False
+    return _looks_like_text(header)
+
+def _has_pdf_header(header: bytes) -> bool:
+    """
+    Finds the PDF header at the start or, as readers tolerate, after leading
+    whitespace or binary junk; never after printable text, so a text resume
+    that mentions "%PDF-1.4" stays text.
+    """
+    offset = header.find(b"%PDF-")
+    if offset < 0:
+        return False
+    junk = header[:offset]
+    return not junk.strip() or not (junk.isascii() and _looks_like_text(junk))
+
+def sniff_format(header: bytes) -> Optional[str]:
+    """
+    Detects the resume format from the first bytes of a file instead of the
+    client-declared content type. Returns 'pdf', 'docx', 'txt' or None.
+    A 'docx' answer only means "zip archive"; detect_format confirms it.
+    """
+    if _has_pdf_header(header):
+        return 'pdf'
+    # DOCX files are zip archives
+    if header.startswith(b"PK\x03\x04"):
+        return 'docx'
+    if header.startswith(tuple(bom for bom, _ in _BOMS)) or _utf16_without_bom(header):
+        return 'txt'
+    if _looks_like_text(header):
+        return 'txt'
+    return None
+
+def _read_header(source: Union[str, bytes]) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source[:SNIFF_BYTES])
+    with open(source, 'rb') as f:
+        return f.read(SNIFF_BYTES)
+
+def detect_format(source: Union[str, bytes]) -> Optional[str]:
+    """
+    Detects the format of a file on disk (by path) or in memory (bytes).
+    Zip archives only count as DOCX when they contain the document part,
+    which the central directory answers without decompressing anything.
+    """
+    file_format = sniff_format(_read_header(source))
+    if file_format == 'docx':
+        try:
+            with zipfile.ZipFile(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source) as archive:
+                archive.getinfo(DOCX_DOCUMENT)
+        except (zipfile.BadZipFile, KeyError):
+            return None
+    return file_format
+
+def decode_text(data) -> str:
+    """
+    Decodes plain-text resume bytes (or any buffer, e.g. an mmap) without a
+    detection library: byte order marks first, then BOM-less UTF-16, then
+    strict UTF-8, then Windows-1252, and finally Latin-1, which never fails.
+    """
+    head = bytes(data[:SNIFF_BYTES])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            # A truncated file may end in half a character
+            return str(data, encoding, errors='replace')
+    utf16 = _utf16_without_bom(head)
+    if utf16:
+        return str(data, utf16, errors='replace')
+    for encoding in ('utf-8', 'cp1252'):
+        try:
+            return str(data, encoding)
+        except UnicodeDecodeError:
+            continue
+    return str(data, 'latin-1')
+
+def _docx_text(source: Union[str, BinaryIO]) -> str:
+    """
+    Streams the text out of a DOCX body with an incremental XML parser,
+    straight from the zip member, so no intermediate files or full DOM are built.
+    Paragraphs become lines; tabs and breaks keep their whitespace.
+    """
+    parts = []
+    with zipfile.ZipFile(source) as archive:
+        try:
+            member = archive.open(DOCX_DOCUMENT)
+        except KeyError:
+            raise ValueError("Not a DOCX file: missing word/document.xml")
+        with member:
+            for _, elem in ET.iterparse(member, events=("end",)):
+                tag = elem.tag
+                if tag == _W + "t":
+                    parts.append(elem.text or "")
+                elif tag == _W + "tab":
+                    parts.append("\t")
+                elif tag in (_W + "br", _W + "cr"):
+                    parts.append("\n")
+                elif tag == _W + "p":
+                    parts.append("\n")
+                    # Paragraphs are done with; drop their subtree to keep memory flat
+                    elem.clear()
+    return "".join(parts)
+
+def _resolve_format(source: Union[str, bytes], file_format: str) -> str:
+    """
+    Prefers the sniffed format over the declared one, which clients often get
+    wrong, except that a declared text file that reads as clean text stays text.
+    """
+    if file_format == 'txt' and _is_clean_text(_read_header(source)):
+        return file_format
+    detected = detect_format(source)
+    if detected and detected != file_format:
+        print(f"Declared format '{file_format}' looks like '{detected}'; using '{detected}'")
+    return detected or file_format
 
 def extract_text_from_file_content(file_bytes: bytes, file_format: str) -> str:
-    """Extracts text from file content bytes based on its format."""
+    """Extracts text from file content bytes based on its (sniffed) format."""
+    file_format = _resolve_format(file_bytes, file_format)
     text = ""
     if file_format == 'pdf':
+        import pdfplumber
         with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
             for page in pdf.pages:
                 text += page.extract_text() or ""
     elif file_format == 'docx':
-        text = docx2txt.process(io.BytesIO(file_bytes))
+        text = _docx_text(io.BytesIO(file_bytes))
+    elif file_format == 'txt':
+        text = decode_text(file_bytes)
+    else:
+        raise ValueError("Unsupported file format")
+    return text
+
+def extract_text_from_path(path: str, file_format: str) -> str:
+    """Extracts text from a file on disk without reading it into memory up front."""
+    file_format = _resolve_format(path, file_format)
+    text = ""
+    if file_format == 'pdf':
+        import pdfplumber
+        # pdfplumber reads pages lazily from the open file
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                text += page.extract_text() or ""
+    elif file_format == 'docx':
+        text = _docx_text(path)
     elif file_format == 'txt':
-        text = file_bytes.decode('utf-8')
+        with open(path, 'rb') as f:
+            # mmap cannot map an empty file
+            if f.seek(0, io.SEEK_END) == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = decode_text(mapped)
     else:
         raise ValueError("Unsupported file format")
-    return text
\ No newline at end of file
+    return text
@@ -0,0 +1,80 @@
+# services/keyword_selection.py
+import json
+import math
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from core import cache, db
+from core.config import settings
+from services import normalization
+
+# Tables for outdated fingerprints are never read again; let them expire
+CORPUS_TTL_SECONDS = 24 * 3600
+
+
+class JDCorpus:
+    """
+    Document frequencies of keywords across the saved job descriptions, used as
+    the IDF side of TF-IDF. Rebuilt lazily whenever the saved descriptions change.
+
+    A rebuilt table is published to the shared cache under the descriptions'
+    fingerprint, so the other worker processes load it instead of re-extracting
+    every description.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[Tuple] = None
+        self._doc_freq: Counter = Counter()
+        self._documents = 0
+
+    def idf(self) -> Tuple[Counter, int]:
+        """Returns the document frequencies and the number of documents."""
+        fingerprint = db.job_descriptions_fingerprint()
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                # Keyword extraction settings change the table as much as the descriptions do
+                key = json.dumps([fingerprint, settings.SKILL_PHRASES_ENABLED, settings.SKILL_DICTIONARY_PATH])
+                shared = cache.shared.get_json("jd_corpus", key)
+                if shared is not None:
+                    doc_freq, documents = Counter(shared["doc_freq"]), shared["documents"]
+                else:
+                    doc_freq = Counter()
+                    rows = db.get_all_job_description()
+                    for row in rows:
+                        doc_freq.update(set(normalization.extract_keywords(row["description"])))
+                    documents = len(rows)
+                    cache.shared.set_json("jd_corpus", key, {"doc_freq": doc_freq, "documents": documents}, CORPUS_TTL_SECONDS)
+                self._doc_freq, self._documents = doc_freq, documents
+                self._fingerprint = fingerprint
+            return self._doc_freq, self._documents
+
+
+corpus = JDCorpus()
+
+
+def select_jd_keywords(jd_keywords: List[str], top_k: Optional[int] = None) -> Dict[str, float]:
+    """
+    Dedupes the keywords of a job description and keeps the `top_k` with the
+    highest TF-IDF against the saved job descriptions.
+
+    Returns:
+        The kept keywords mapped to weights summing to 1, highest weight first.
+    """
+    top_k = settings.JD_KEYWORDS_TOP_K if top_k is None else top_k
+    counts = Counter(jd_keywords)
+    if not counts:
+        return {}
+    doc_freq, documents = corpus.idf()
+
+    # Smoothed IDF, as in scikit-learn: terms seen in every saved JD still count a little
+    tf_idf = {
+        keyword: count * (math.log((1 + documents) / (1 + doc_freq[keyword])) + 1)
+        for keyword, count in counts.items()
+    }
+    ranked = sorted(tf_idf.items(), key=lambda item: (-item[1], item[0]))
+    if top_k > 0:
+        ranked = ranked[:top_k]
+    total = sum(weight for _, weight in ranked)
+    return {keyword: weight / total for keyword, weight in ranked}
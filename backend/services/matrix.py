@@ -0,0 +1,124 @@
+# services/matrix.py
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services import embedding_dispatcher
+from services.call_policy import ModelUnavailableError
+from services.comparison import SIMILARITY_THRESHOLD, is_fuzzy_matchable
+
+
+def _vocabulary(keyword_lists: List[List[str]]) -> Dict[str, int]:
+    vocab: Dict[str, int] = {}
+    for keywords in keyword_lists:
+        for keyword in keywords:
+            vocab.setdefault(keyword, len(vocab))
+    return vocab
+
+
+def _index_lists(keyword_lists: List[List[str]], vocab: Dict[str, int]) -> List[np.ndarray]:
+    return [np.array(sorted({vocab[k] for k in keywords}), dtype=np.intp) for keywords in keyword_lists]
+
+
+def score_matrix(resume_keywords: List[List[str]], jd_keywords: List[List[str]], jd_weights: Optional[List[Dict[str, float]]] = None) -> dict:
+    """
+    Scores every resume against every job description in a few vectorized passes.
+
+    Each distinct JD keyword is fuzzy-matched and embedded once against each
+    distinct resume keyword, no matter how many resumes or jobs share it. Scores
+    follow hard_compare and get_embedding_fit_score over unique keywords, with
+    each job's keywords weighted by `jd_weights` when given.
+
+    Returns:
+        A dictionary with `hard`, `embedding` (None if the embedding model was
+        unavailable) and `final` score arrays of shape (resumes, jobs), the
+        `found` keyword mask per resume and the vocabulary needed to list missing
+        keywords for a pair.
+    """
+    jd_vocab = _vocabulary(jd_keywords)
+    resume_vocab = _vocabulary(resume_keywords)
+    jd_index = _index_lists(jd_keywords, jd_vocab)
+    resume_index = _index_lists(resume_keywords, resume_vocab)
+    n_resumes, n_jobs = len(resume_keywords), len(jd_keywords)
+
+    # Weight of each vocabulary keyword in each job, normalized per job so a
+    # matrix product takes that job's (weighted) average over its keywords.
+    weight_matrix = np.zeros((n_jobs, len(jd_vocab)))
+    for j, idx in enumerate(jd_index):
+        if jd_weights is not None:
+            for keyword in set(jd_keywords[j]):
+                weight_matrix[j, jd_vocab[keyword]] = jd_weights[j].get(keyword, 0.0)
+        elif len(idx):
+            weight_matrix[j, idx] = 1.0
+        total = weight_matrix[j].sum()
+        if total > 0:
+            weight_matrix[j] /= total
+
+    # 1. Fuzzy similarity of every JD keyword against every resume keyword, once.
+    found = np.zeros((len(jd_vocab), n_resumes), dtype=bool)
+    if jd_vocab and resume_vocab:
+        # Imported on first use, like the rest of the fuzzy matching (see comparison)
+        from rapidfuzz import fuzz, process, utils
+        similarity = process.cdist(
+            list(jd_vocab), list(resume_vocab),
+            scorer=fuzz.WRatio, processor=utils.default_process, workers=-1,
+        )
+        matches = np.rint(similarity) >= SIMILARITY_THRESHOLD
+        # Keywords with symbols ('c++', 'c#') only match themselves, as in hard_compare
+        resume_terms = np.array(list(resume_vocab), dtype=object)
+        for a, keyword in enumerate(jd_vocab):
+            if not is_fuzzy_matchable(keyword):
+                matches[a] = resume_terms == keyword
+        for r, idx in enumerate(resume_index):
+            if len(idx):
+                found[:, r] = matches[:, idx].any(axis=1)
+    hard = (weight_matrix @ found).T * 100
+
+    # 2. Embedding similarity, with all distinct keywords sent through the dispatcher.
+    embedding: Optional[np.ndarray] = None
+    if jd_vocab and resume_vocab:
+        try:
+            vectors = np.array(embedding_dispatcher.dispatcher.embed(list(jd_vocab) + list(resume_vocab)))
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+            cosine = vectors[:len(jd_vocab)] @ vectors[len(jd_vocab):].T
+            best = np.zeros((len(jd_vocab), n_resumes))
+            for r, idx in enumerate(resume_index):
+                if len(idx):
+                    best[:, r] = cosine[:, idx].max(axis=1)
+            # Same "widen the gap" penalty as get_embedding_fit_score
+            embedding = ((weight_matrix @ best ** 2).T * 100).astype(int)
+        except ModelUnavailableError as e:
+            print(f"Embedding scores unavailable for matrix: {e}")
+    else:
+        embedding = np.zeros((n_resumes, n_jobs), dtype=int)
+
+    if embedding is None:
+        final = hard.astype(int)
+    else:
+        final = (0.65 * embedding + 0.35 * hard).astype(int)
+
+    return {
+        "hard": hard,
+        "embedding": embedding,
+        "final": final,
+        "found": found,
+        "jd_vocab": list(jd_vocab),
+        "jd_index": jd_index,
+    }
+
+
+def missing_keywords(scores: dict, resume: int, job: int) -> List[str]:
+    """Lists the keywords of a job that were not found in a resume."""
+    vocab = scores["jd_vocab"]
+    return sorted(vocab[a] for a in scores["jd_index"][job] if not scores["found"][a, resume])
+
+
+def top_pairs(final: np.ndarray, k: int) -> List[tuple]:
+    """The (resume, job) pairs of the k highest-scoring resumes for each job."""
+    pairs = []
+    if k <= 0:
+        return pairs
+    for j in range(final.shape[1]):
+        for r in np.argsort(-final[:, j], kind="stable")[:k]:
+            pairs.append((int(r), j))
+    return pairs
@@ -1,15 +1,54 @@
 # services/normalization.py
-# (This file remains the same as the original answer)
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
+# nltk is imported on first use (or during startup warmup); importing it takes
+# about a second, most of it in modules this service never touches.
+from functools import lru_cache
+
+from core.config import settings
+from services import skills
+
+# NLTK data packages used here: (resource path, package name)
+NLTK_RESOURCES = (("tokenizers/punkt_tab", "punkt_tab"), ("corpora/stopwords", "stopwords"))
+
+
+def word_tokenize(text: str) -> list:
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+    return nltk_word_tokenize(text)
+
+
+@lru_cache(maxsize=1)
+def stop_words() -> frozenset:
+    """The English stopword list, loaded once per process."""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+def ensure_nltk_data() -> None:
+    """Makes sure the NLTK data is available, downloading missing packages."""
+    import nltk
+    for resource, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            print(f"NLTK package '{package}' not found; downloading it")
+            nltk.download(package, quiet=True)
 
 
 def normalize_text(text: str) -> str:
     tokens = word_tokenize(text)
     words = [word.lower() for word in tokens if word.isalpha()]
     print(f"Tokens after isalpha filter: {words}")
-    stop_words = set(stopwords.words('english'))
-    filtered_words = [word for word in words if word not in stop_words]
-    return filtered_words
\ No newline at end of file
+    stop = stop_words()
+    filtered_words = [word for word in words if word not in stop]
+    return filtered_words
+
+
+def extract_keywords(text: str) -> list:
+    """
+    Returns the keywords compared by the scoring steps: the dictionary skill
+    phrases found in the text, followed by the normalized tokens of the text
+    around them. Repeats are kept so term frequencies can be counted.
+    """
+    if not settings.SKILL_PHRASES_ENABLED:
+        return normalize_text(text)
+    phrases, rest = skills.partition_skills(text)
+    return phrases + normalize_text(rest)
@@ -0,0 +1,103 @@
+# services/rescoring.py
+import json
+from typing import Dict, Optional
+
+from core import db
+from services import keyword_selection, matrix, normalization
+from services.comparison import verdict_for_score
+
+
+def _load(value: Optional[str]):
+    return json.loads(value) if value else None
+
+
+def _soft_analysis(row) -> Optional[str]:
+    """The soft analysis suggestions can be regenerated from, if the evaluation kept one."""
+    inputs = _load(row["suggestion_inputs"]) or {}
+    return inputs.get("soft_analysis") or row["soft_analysis"]
+
+
+def rescore_job(job_id: int, description: str, regenerate_text: bool = False) -> Dict:
+    """
+    Re-scores every evaluation linked to a job description against its current
+    text, reusing the resume keywords stored with each evaluation (and their
+    cached embeddings) instead of re-processing the resumes.
+
+    Only evaluations whose stored JD keyword weights differ from the current
+    ones are recomputed; the keyword, embedding and final scores, missing
+    keywords and verdict are updated in one transaction. Suggestions are kept
+    unless `regenerate_text` is set, in which case they are cleared and
+    regenerated on the next read of each evaluation that kept its soft
+    analysis. Evaluations without one (score mode, degraded or saved before it
+    was kept) keep their suggestions.
+
+    Returns:
+        Counts of rescored, unchanged and skipped evaluations and of those
+        whose suggestions could not be regenerated, and the JD keywords added
+        and removed compared with the stale evaluations.
+    """
+    jd_weights = keyword_selection.select_jd_keywords(normalization.extract_keywords(description))
+    rows = db.get_evaluations_for_job(job_id)
+
+    stale, skipped, unchanged = [], 0, 0
+    old_keywords = set()
+    for row in rows:
+        # Failed analyses, evaluations saved before re-scoring existed and
+        # resumed runs whose keywords weren't seen
+        if not row["resume_keywords"] or row["jd_weights"] is None:
+            skipped += 1
+            continue
+        old_weights = _load(row["jd_weights"]) or {}
+        if old_weights == jd_weights and not (regenerate_text and _soft_analysis(row)):
+            unchanged += 1
+            continue
+        old_keywords.update(old_weights)
+        stale.append(row)
+
+    summary = {
+        "rescored": len(stale),
+        "unchanged": unchanged,
+        "skipped": skipped,
+        "text_not_regenerated": 0,
+        "keywords_added": sorted(set(jd_weights) - old_keywords) if stale else [],
+        "keywords_removed": sorted(old_keywords - set(jd_weights)),
+        "degraded": [],
+    }
+    if not stale:
+        return summary
+
+    # Score all stale evaluations in one vectorized pass; only JD keywords
+    # never embedded before reach the embedding model.
+    scores = matrix.score_matrix(
+        [_load(row["resume_keywords"]) for row in stale], [list(jd_weights)], [jd_weights]
+    )
+    if scores["embedding"] is None:
+        summary["degraded"] = ["embedding_score"]
+
+    weights_json = json.dumps(jd_weights)
+    updates = []
+    for r, row in enumerate(stale):
+        final = int(scores["final"][r, 0])
+        missing = matrix.missing_keywords(scores, r, 0)
+        result = _load(row["result_json"]) or {}
+        degraded = [d for d in result.get("degraded", []) if d != "embedding_score"] + summary["degraded"]
+        result.update(relevance_score=final, missing_keywords=missing, verdict=verdict_for_score(final), degraded=degraded)
+
+        # Pending (lazy) suggestion inputs are refreshed so the suggestions match the new score
+        inputs = _load(row["suggestion_inputs"])
+        soft_analysis = _soft_analysis(row)
+        if inputs or (regenerate_text and soft_analysis):
+            result["suggestions"] = None
+            inputs = {
+                "score": final,
+                "missing_keywords": missing,
+                "soft_analysis": soft_analysis or "",
+            }
+        elif regenerate_text:
+            summary["text_not_regenerated"] += 1
+        updates.append((
+            json.dumps(result), float(final), result["verdict"], description, weights_json,
+            json.dumps(inputs) if inputs else None, row["id"],
+        ))
+    db.update_rescored_evaluations(updates)
+    return summary
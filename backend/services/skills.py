@@ -0,0 +1,146 @@
+# services/skills.py
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.config import settings
+
+# Bundled dictionary, used unless SKILL_DICTIONARY_PATH points elsewhere
+DEFAULT_DICTIONARY = Path(__file__).with_name("skill_dictionary.txt")
+
+
+def load_dictionary(path: Path) -> Dict[str, str]:
+    """
+    Reads a skill dictionary into an alias -> canonical phrase mapping.
+
+    One skill per line: the canonical phrase followed by optional aliases, all
+    separated by '|'. Blank lines and lines starting with '#' are ignored.
+    """
+    phrases: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            names = [" ".join(name.lower().split()) for name in line.split("|")]
+            canonical = names[0]
+            for name in names:
+                if name:
+                    phrases.setdefault(name, canonical)
+    return phrases
+
+
+class SkillMatcher:
+    """
+    An Aho-Corasick automaton over the dictionary phrases. Finds every phrase in
+    one pass over the text, however many phrases the dictionary holds.
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: the (length, canonical) of every phrase ending there
+        self._out: List[List[Tuple[int, str]]] = [[]]
+        for phrase, canonical in phrases.items():
+            self._add(phrase, canonical)
+        self._link()
+
+    def _add(self, phrase: str, canonical: str) -> None:
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(phrase), canonical))
+
+    def _link(self) -> None:
+        """Computes failure links breadth-first and merges the outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """The (start, end, canonical) of each match in `text`, leftmost then longest first."""
+        matches = []
+        state = 0
+        for end, ch in enumerate(text, start=1):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, canonical in self._out[state]:
+                start = end - length
+                if _on_boundary(text, start, end):
+                    matches.append((start, -length, canonical))
+
+        spans: List[Tuple[int, int, str]] = []
+        covered = 0
+        for start, neg_length, canonical in sorted(matches):
+            if start >= covered:
+                covered = start - neg_length
+                spans.append((start, covered, canonical))
+        return spans
+
+    def find(self, text: str, unique: bool = True) -> List[str]:
+        """
+        Returns the canonical skills in `text` in order of first appearance, or
+        every occurrence in order when `unique` is False.
+        Matching is case-insensitive, treats any run of whitespace as one space
+        and only accepts phrases that are not part of a longer word. Overlapping
+        matches resolve to the leftmost, then longest, phrase.
+        """
+        found = [canonical for _, _, canonical in self._spans(" ".join(text.lower().split()))]
+        return list(dict.fromkeys(found)) if unique else found
+
+    def partition(self, text: str) -> Tuple[List[str], str]:
+        """
+        Returns every skill occurrence in `text` (as `find` with `unique` False)
+        and the rest of the text, lowercased, with those occurrences blanked out.
+        """
+        text = " ".join(text.lower().split())
+        found: List[str] = []
+        rest: List[str] = []
+        position = 0
+        for start, end, canonical in self._spans(text):
+            found.append(canonical)
+            rest.append(text[position:start])
+            position = end
+        rest.append(text[position:])
+        return found, " ".join(rest)
+
+
+def _on_boundary(text: str, start: int, end: int) -> bool:
+    # Edges that are symbols ('.net', 'c++') already delimit themselves
+    if text[start].isalnum() and start > 0 and text[start - 1].isalnum():
+        return False
+    if text[end - 1].isalnum() and end < len(text) and text[end].isalnum():
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_matcher(path: Optional[str] = None) -> SkillMatcher:
+    """Builds the automaton once per process for the configured dictionary."""
+    return SkillMatcher(load_dictionary(Path(path) if path else DEFAULT_DICTIONARY))
+
+
+def find_skills(text: str, unique: bool = True) -> List[str]:
+    """Finds the dictionary skills mentioned in `text`."""
+    return get_matcher(settings.SKILL_DICTIONARY_PATH).find(text, unique)
+
+
+def partition_skills(text: str) -> Tuple[List[str], str]:
+    """Splits `text` into the dictionary skills it mentions and the text around them."""
+    return get_matcher(settings.SKILL_DICTIONARY_PATH).partition(text)
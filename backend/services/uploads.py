@@ -0,0 +1,133 @@
+# services/uploads.py
+import asyncio
+import hashlib
+import os
+import tempfile
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple, Union
+
+from fastapi import UploadFile
+
+# Size of each read from the incoming upload
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the per-file or per-batch size limit."""
+
+
+class BatchBudget:
+    """Tracks the bytes spooled so far for one batch request."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+
+    def consume(self, n: int) -> None:
+        self.used += n
+        if self.used > self.max_bytes:
+            raise UploadTooLargeError(f"Batch exceeds the {self.max_bytes} byte upload limit")
+
+
+@dataclass
+class SpooledUpload:
+    """An upload copied to a temporary file on disk."""
+    path: str
+    size: int
+    sha256: str
+    filename: Optional[str] = None
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int, budget: Optional[BatchBudget] = None) -> SpooledUpload:
+    """
+    Copies an upload to a temporary file of its own in fixed-size chunks,
+    enforcing the per-file limit (and the batch budget, if given), so the
+    whole file is never held in memory.
+
+    Starlette has already received the whole body by now (spooled to disk past
+    1 MB); oversized requests are refused before that by the request size
+    limit (core/request_limits.py).
+    """
+    suffix = os.path.splitext(upload.filename or "")[1]
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=suffix)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"{upload.filename} exceeds the {max_bytes} byte upload limit")
+                if budget is not None:
+                    budget.consume(len(chunk))
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return SpooledUpload(path=path, size=size, sha256=digest.hexdigest(), filename=upload.filename)
+
+
+def _spool_stream(stream, filename: str, max_bytes: int, budget: Optional[BatchBudget]) -> SpooledUpload:
+    """Copies a readable binary stream to a temporary file, enforcing the limits on bytes actually read."""
+    suffix = os.path.splitext(filename)[1]
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=suffix)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := stream.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"{filename} exceeds the {max_bytes} byte uncompressed size limit")
+                if budget is not None:
+                    budget.consume(len(chunk))
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return SpooledUpload(path=path, size=size, sha256=digest.hexdigest(), filename=filename)
+
+
+def iter_zip_members(archive_path: str, max_member_bytes: int, budget: BatchBudget, max_members: int) -> Iterator[Tuple[str, Union[SpooledUpload, Exception]]]:
+    """
+    Lazily decompresses the files of a zip archive, one member at a time.
+
+    Yields (member name, spooled file or the error for that member). Sizes are
+    checked against the declared size first and then against the bytes actually
+    decompressed, so a zip bomb is stopped as soon as it exceeds the per-file
+    limit or the batch budget (which raises and ends the iteration).
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        count = 0
+        for info in archive.infolist():
+            name = info.filename
+            base = os.path.basename(name)
+            # Skip directories and macOS/hidden metadata entries
+            if info.is_dir() or not base or base.startswith(".") or name.startswith("__MACOSX/"):
+                continue
+            count += 1
+            if count > max_members:
+                raise UploadTooLargeError(f"Archive has more than {max_members} files")
+            if info.file_size > max_member_bytes:
+                yield name, UploadTooLargeError(f"{name} exceeds the {max_member_bytes} byte uncompressed size limit")
+                continue
+            try:
+                with archive.open(info) as member:
+                    yield name, _spool_stream(member, name, max_member_bytes, budget)
+            except UploadTooLargeError as e:
+                if budget.used > budget.max_bytes:
+                    raise
+                yield name, e
+            except (zipfile.BadZipFile, zlib.error, EOFError, RuntimeError, NotImplementedError) as e:
+                # Corrupt, truncated, encrypted or unsupported-compression members
+                yield name, e
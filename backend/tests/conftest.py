@@ -0,0 +1,4 @@
+import os
+
+# Settings are loaded on import and require an API key; the tests never reach Google
+os.environ.setdefault("GOOGLE_API_KEY", "test")
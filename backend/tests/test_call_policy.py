@@ -0,0 +1,127 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from services.call_policy import CallPolicy, CircuitBreaker, CircuitOpenError, ModelUnavailableError, RateLimitTimeout, TokenBucket
+from tools.fake_model_server import FakeModelHandler, ThreadingHTTPServer
+
+
+@pytest.fixture
+def fake_server():
+    """Runs tools/fake_model_server.py on a free port and resets its knobs afterwards."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeModelHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FakeModelHandler.calls = 0
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    FakeModelHandler.error_rate = FakeModelHandler.latency = FakeModelHandler.straggler_rate = 0.0
+
+
+def embed(base_url: str, text: str = "python") -> list:
+    response = httpx.post(f"{base_url}/v1beta/models/fake:embedContent", json={"content": {"parts": [{"text": text}]}})
+    if response.status_code != 200:
+        # Carries the status in the message, like langchain-google-genai's errors
+        raise RuntimeError(f"{response.status_code} {response.json()['error']['status']}")
+    return response.json()["embedding"]["values"]
+
+
+def make_policy(max_retries=3, failure_threshold=2, reset_seconds=60.0, hedge_after=None) -> CallPolicy:
+    return CallPolicy(
+        name="test",
+        rate_per_second=1000,
+        burst=100,
+        max_retries=max_retries,
+        backoff_base=0.001,
+        backoff_max=0.01,
+        hedge_after=hedge_after,
+        breaker=CircuitBreaker(failure_threshold, reset_seconds),
+    )
+
+
+def test_retries_until_the_model_answers(fake_server):
+    FakeModelHandler.error_rate = 1.0
+    policy = make_policy()
+
+    def flaky():
+        if FakeModelHandler.calls == 2:
+            FakeModelHandler.error_rate = 0.0
+        return embed(fake_server)
+
+    assert len(policy.call(flaky)) > 0
+    assert FakeModelHandler.calls == 3
+    assert policy.breaker.state == "closed"
+
+
+def test_one_call_exhausting_its_retries_does_not_open_the_breaker(fake_server):
+    FakeModelHandler.error_rate = 1.0
+    policy = make_policy(max_retries=3, failure_threshold=2)
+
+    with pytest.raises(ModelUnavailableError):
+        policy.call(embed, fake_server)
+    assert FakeModelHandler.calls == 4
+    assert policy.breaker.state == "closed"
+
+    # A second failed call reaches the threshold; the next one fails fast
+    with pytest.raises(ModelUnavailableError):
+        policy.call(embed, fake_server)
+    assert policy.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        policy.call(embed, fake_server)
+    assert FakeModelHandler.calls == 8
+
+
+def test_failed_half_open_trial_reopens_without_retrying(fake_server):
+    FakeModelHandler.error_rate = 1.0
+    policy = make_policy(failure_threshold=1, reset_seconds=0.05)
+    with pytest.raises(ModelUnavailableError):
+        policy.call(embed, fake_server)
+    time.sleep(0.06)
+    assert policy.breaker.state == "half_open"
+
+    calls = FakeModelHandler.calls
+    with pytest.raises(ModelUnavailableError):
+        policy.call(embed, fake_server)
+    assert FakeModelHandler.calls == calls + 1
+    assert policy.breaker.state == "open"
+
+    time.sleep(0.06)
+    FakeModelHandler.error_rate = 0.0
+    policy.call(embed, fake_server)
+    assert policy.breaker.state == "closed"
+
+
+def test_rate_limit_timeout_does_not_strand_the_half_open_trial(fake_server):
+    FakeModelHandler.error_rate = 1.0
+    policy = make_policy(failure_threshold=1, reset_seconds=0.05)
+    with pytest.raises(ModelUnavailableError):
+        policy.call(embed, fake_server)
+    time.sleep(0.06)
+
+    policy.bucket = TokenBucket(rate=0.001, capacity=1)
+    policy.bucket.try_acquire()
+    with pytest.raises(RateLimitTimeout):
+        policy.call(embed, fake_server)
+
+    FakeModelHandler.error_rate = 0.0
+    policy.bucket = TokenBucket(rate=1000, capacity=100)
+    policy.call(embed, fake_server)
+    assert policy.breaker.state == "closed"
+
+
+def test_slow_call_is_hedged(fake_server):
+    FakeModelHandler.latency = 0.3
+    policy = make_policy(hedge_after=0.05)
+
+    began = time.monotonic()
+    assert len(policy.call(embed, fake_server)) > 0
+    assert time.monotonic() - began < 0.55
+    assert FakeModelHandler.calls == 2
+
+
+def test_fast_call_is_not_hedged(fake_server):
+    policy = make_policy(hedge_after=0.5)
+    policy.call(embed, fake_server)
+    assert FakeModelHandler.calls == 1
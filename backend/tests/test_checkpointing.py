@@ -0,0 +1,36 @@
+import asyncio
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from core.config import settings
+from graph import checkpointing
+
+
+def config_for(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+async def thread_ids(saver) -> set:
+    async with saver.conn.execute("SELECT DISTINCT thread_id FROM checkpoints") as cur:
+        return {row[0] for row in await cur.fetchall()}
+
+
+def test_sweep_deletes_only_expired_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.db"))
+    monkeypatch.setattr(settings, "CHECKPOINT_TTL_SECONDS", 3600)
+
+    async def scenario():
+        saver = checkpointing.open_checkpointer()
+        for thread_id in ("failed-long-ago", "failed-recently"):
+            await saver.aput(config_for(thread_id), empty_checkpoint(), {}, {})
+        await saver.conn.execute(
+            "UPDATE thread_activity SET updated_at = updated_at - 7200 WHERE thread_id = 'failed-long-ago'"
+        )
+        await saver.conn.commit()
+
+        assert await saver.sweep() == 1
+        remaining = await thread_ids(saver)
+        await saver.conn.close()
+        return remaining
+
+    assert asyncio.run(scenario()) == {"failed-recently"}
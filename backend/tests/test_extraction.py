@@ -0,0 +1,22 @@
+from services import extraction
+
+
+def test_pdf_header_is_found_at_the_start_or_after_junk():
+    assert extraction.sniff_format(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n") == "pdf"
+    assert extraction.sniff_format(b"\r\n  %PDF-1.4\n") == "pdf"
+    assert extraction.sniff_format(b"\x00\x00\xff junk %PDF-1.4\n") == "pdf"
+
+
+def test_text_mentioning_the_pdf_header_stays_text():
+    assert extraction.sniff_format(b"Experience with %PDF-1.4 generation in Python") == "txt"
+
+
+def test_declared_text_that_reads_cleanly_is_not_reclassified(tmp_path):
+    path = tmp_path / "resume.txt"
+    path.write_bytes(b"%PDF-1.4 tooling, Python and Docker")
+    assert extraction.extract_text_from_path(str(path), "txt") == "%PDF-1.4 tooling, Python and Docker"
+
+
+def test_bom_text_with_a_truncated_last_character_decodes():
+    data = "Python".encode("utf-16") + b"\x00"
+    assert extraction.decode_text(data) == "Python�"
@@ -0,0 +1,28 @@
+import time
+
+from core import profiling
+from core.config import settings
+
+
+def test_peak_rss_includes_transient_allocations_inside_a_node(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_RSS_INTERVAL_SECONDS", 0.01)
+
+    def node(state: dict) -> dict:
+        # Touched so the pages are resident, and freed before the node returns
+        buffer = bytearray(b"x" * (200 * 2**20))
+        time.sleep(0.2)
+        del buffer
+        return state
+
+    profile = profiling.start_analysis("transient")
+    token = profiling.current_profile.set(profile)
+    try:
+        profiling.profiled("transient", node)({})
+    finally:
+        profiling.current_profile.reset(token)
+        profiling.finish_analysis(profile)
+
+    assert profile.nodes[0]["rss_bytes"] - profile.rss_start < 100 * 2**20
+    assert profile.peak_rss - profile.rss_start > 150 * 2**20
@@ -0,0 +1,37 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from core.request_limits import RequestSizeLimitMiddleware
+
+app = FastAPI()
+app.add_middleware(RequestSizeLimitMiddleware, max_bytes=1024)
+
+
+@app.post("/upload")
+async def upload(resume: UploadFile = File(...)):
+    return {"size": len(await resume.read())}
+
+
+client = TestClient(app)
+
+
+def test_body_within_the_limit_is_parsed():
+    response = client.post("/upload", files={"resume": ("r.txt", b"x" * 100, "text/plain")})
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+
+def test_oversized_content_length_is_refused_before_parsing():
+    response = client.post("/upload", files={"resume": ("r.txt", b"x" * 4096, "text/plain")})
+    assert response.status_code == 413
+
+
+def test_oversized_chunked_body_is_refused():
+    body = b"--b\r\nContent-Disposition: form-data; name=\"resume\"; filename=\"r.txt\"\r\n\r\n" + b"x" * 4096 + b"\r\n--b--\r\n"
+    response = client.post(
+        "/upload",
+        content=iter([body[:512], body[512:]]),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from core.config import settings
+from services import normalization, skills
+from services.skills import SkillMatcher
+
+
+@pytest.fixture
+def matcher():
+    return SkillMatcher({
+        "machine learning": "machine learning",
+        "ml": "machine learning",
+        "learning": "learning",
+        "c++": "c++",
+        "c": "c",
+        ".net": ".net",
+        "java": "java",
+        "javascript": "javascript",
+        "teamwork": "teamwork",
+    })
+
+
+def test_find_is_case_and_whitespace_insensitive(matcher):
+    assert matcher.find("Applied  MACHINE\nLearning daily") == ["machine learning"]
+
+
+def test_find_maps_aliases_to_the_canonical_phrase(matcher):
+    assert matcher.find("ML and machine learning", unique=False) == ["machine learning", "machine learning"]
+    assert matcher.find("ML and machine learning") == ["machine learning"]
+
+
+def test_find_only_matches_whole_words(matcher):
+    assert matcher.find("javascripts, html") == []
+    assert matcher.find("JavaScript and Java") == ["javascript", "java"]
+
+
+def test_find_accepts_symbol_edges(matcher):
+    assert matcher.find("C++, C and .NET") == ["c++", "c", ".net"]
+    assert matcher.find("asp.net") == [".net"]
+
+
+def test_find_prefers_the_leftmost_then_longest_phrase(matcher):
+    assert matcher.find("machine learning") == ["machine learning"]
+    assert matcher.find("deep learning") == ["learning"]
+
+
+def test_partition_blanks_out_the_matched_phrases(matcher):
+    found, rest = matcher.partition("Patient care, teamwork and Machine Learning.")
+    assert found == ["teamwork", "machine learning"]
+    assert rest.split() == ["patient", "care,", "and", "."]
+
+
+@pytest.fixture
+def plain_tokens(monkeypatch, matcher):
+    monkeypatch.setattr(normalization, "word_tokenize", lambda text: re.findall(r"\w+|[^\w\s]", text))
+    monkeypatch.setattr(normalization, "stop_words", lambda: frozenset({"and", "with"}))
+    monkeypatch.setattr(skills, "get_matcher", lambda path=None: matcher)
+    monkeypatch.setattr(settings, "SKILL_PHRASES_ENABLED", True)
+
+
+def test_keywords_keep_the_words_around_phrases(plain_tokens):
+    jd = "Patient care, triage, medication administration, charting and teamwork"
+    assert normalization.extract_keywords(jd) == [
+        "teamwork", "patient", "care", "triage", "medication", "administration", "charting",
+    ]
+
+
+def test_keywords_are_extracted_the_same_way_with_or_without_phrases(plain_tokens):
+    assert normalization.extract_keywords("Python with Docker") == ["python", "docker"]
+    assert normalization.extract_keywords("Python with Docker and Java") == ["java", "python", "docker"]
+
+
+def test_keywords_are_plain_tokens_when_phrases_are_disabled(plain_tokens, monkeypatch):
+    monkeypatch.setattr(settings, "SKILL_PHRASES_ENABLED", False)
+    assert normalization.extract_keywords("Machine learning and teamwork") == ["machine", "learning", "teamwork"]
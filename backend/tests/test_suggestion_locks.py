@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+from api.v1.routers import analysis
+from services.call_policy import ModelUnavailableError
+
+
+def test_reader_arriving_after_a_failed_holder_shares_the_lock(monkeypatch):
+    row = {
+        "result_json": json.dumps({"suggestions": None}),
+        "suggestion_inputs": json.dumps({"score": 50, "missing_keywords": [], "soft_analysis": ""}),
+    }
+    calls = []
+
+    def update_evaluation_result(eval_id, result_json):
+        row.update(result_json=result_json, suggestion_inputs=None)
+        return True
+
+    def generate(score, hard_analysis, soft_analysis):
+        calls.append(score)
+        # The first call fails, so its waiter (and any later reader) must retry
+        if len(calls) == 1:
+            raise ModelUnavailableError("busy")
+        return {"suggestions": "Add Docker."}
+
+    monkeypatch.setattr(analysis.db, "get_evaluation", lambda eval_id: row)
+    monkeypatch.setattr(analysis.db, "update_evaluation_result", update_evaluation_result)
+    monkeypatch.setattr(analysis.comparison, "get_final_verdict_and_suggestions", generate)
+
+    async def scenario():
+        holder = asyncio.create_task(analysis._generate_pending_suggestions(1))
+        waiter = asyncio.create_task(analysis._generate_pending_suggestions(1))
+        await holder
+        # The holder has released the lock but the waiter may not have run yet
+        late = asyncio.create_task(analysis._generate_pending_suggestions(1))
+        await asyncio.gather(waiter, late)
+
+    asyncio.run(scenario())
+
+    assert len(calls) == 2
+    assert json.loads(row["result_json"])["suggestions"] == "Add Docker."
+    assert not analysis._suggestion_locks and not analysis._suggestion_waiters
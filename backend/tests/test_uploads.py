@@ -0,0 +1,76 @@
+import struct
+import zipfile
+
+from services import uploads
+
+
+def write_archive(path, members):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+def data_offset(raw: bytes, header_offset: int) -> int:
+    name_length, extra_length = struct.unpack_from("<HH", raw, header_offset + 26)
+    return header_offset + 30 + name_length + extra_length
+
+
+def corrupt_member(path, name):
+    """Overwrites the start of a member's compressed data with bytes that aren't valid deflate."""
+    with zipfile.ZipFile(path) as archive:
+        header_offset = archive.getinfo(name).header_offset
+    raw = bytearray(path.read_bytes())
+    start = data_offset(raw, header_offset)
+    raw[start:start + 8] = b"\xff" * 8
+    path.write_bytes(bytes(raw))
+
+
+def truncate_member(path, name):
+    """Halves a member's recorded compressed size, as if its data had been cut off."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name)
+        central_dir = archive.start_dir
+    raw = bytearray(path.read_bytes())
+    size = info.compress_size // 2
+    struct.pack_into("<I", raw, info.header_offset + 18, size)
+    position = central_dir
+    while raw[position:position + 4] == b"PK\x01\x02":
+        name_length, extra_length, comment_length = struct.unpack_from("<HHH", raw, position + 28)
+        if raw[position + 46:position + 46 + name_length].decode() == name:
+            struct.pack_into("<I", raw, position + 20, size)
+        position += 46 + name_length + extra_length + comment_length
+    path.write_bytes(bytes(raw))
+
+
+def spooled_members(path):
+    budget = uploads.BatchBudget(10 * 1024 * 1024)
+    results = {}
+    for name, item in uploads.iter_zip_members(str(path), 1024 * 1024, budget, 100):
+        if isinstance(item, Exception):
+            results[name] = item
+        else:
+            with open(item.path, "rb") as f:
+                results[name] = f.read()
+            item.remove()
+    return results
+
+
+def test_corrupt_member_is_reported_for_that_file_only(tmp_path):
+    path = tmp_path / "resumes.zip"
+    write_archive(path, {"a.txt": "python " * 200, "bad.txt": "docker " * 200, "c.txt": "sql " * 200})
+    corrupt_member(path, "bad.txt")
+
+    results = spooled_members(path)
+    assert results["a.txt"] == b"python " * 200
+    assert isinstance(results["bad.txt"], Exception)
+    assert results["c.txt"] == b"sql " * 200
+
+
+def test_truncated_member_is_reported_for_that_file_only(tmp_path):
+    path = tmp_path / "resumes.zip"
+    write_archive(path, {"cut.txt": " ".join(str(i) for i in range(5000)), "ok.txt": "python"})
+    truncate_member(path, "cut.txt")
+
+    results = spooled_members(path)
+    assert isinstance(results["cut.txt"], Exception)
+    assert results["ok.txt"] == b"python"
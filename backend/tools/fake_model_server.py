@@ -0,0 +1,100 @@
+# tools/fake_model_server.py
+"""
+A tiny stand-in for the Gemini REST API, for exercising the call policy locally.
+
+    python tools/fake_model_server.py --port 8089 --error-rate 0.3 --latency 0.2
+    GOOGLE_API_ENDPOINT=http://localhost:8089 uvicorn main:app
+
+It answers generateContent, embedContent and batchEmbedContents. A configurable
+fraction of requests fail with 429 RESOURCE_EXHAUSTED, and every response can be
+delayed (with an occasional slow straggler) to exercise retries and hedging.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DIMENSIONS = 64
+
+
+def fake_embedding(text: str) -> list[float]:
+    """Character-trigram hashing, so similar strings get similar vectors."""
+    vec = [0.0] * DIMENSIONS
+    padded = f"  {text.lower()} "
+    for i in range(len(padded) - 2):
+        digest = hashlib.md5(padded[i:i + 3].encode()).digest()
+        vec[digest[0] % DIMENSIONS] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _text_of(content: dict) -> str:
+    return " ".join(part.get("text", "") for part in content.get("parts", []))
+
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    error_rate = 0.0
+    latency = 0.0
+    straggler_rate = 0.0
+    calls = 0
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        type(self).calls += 1
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        delay = self.latency * (10 if random.random() < self.straggler_rate else 1)
+        time.sleep(delay)
+        if random.random() < self.error_rate:
+            self._send(429, {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}})
+            return
+
+        path = self.path.split("?")[0]
+        if path.endswith(":batchEmbedContents"):
+            embeddings = [{"values": fake_embedding(_text_of(r.get("content", {})))} for r in request.get("requests", [])]
+            self._send(200, {"embeddings": embeddings})
+        elif path.endswith(":embedContent"):
+            self._send(200, {"embedding": {"values": fake_embedding(_text_of(request.get("content", {})))}})
+        elif path.endswith(":generateContent"):
+            prompt = " ".join(_text_of(c) for c in request.get("contents", []))
+            text = f"Fake analysis of a {len(prompt)} character prompt."
+            self._send(200, {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": 8, "totalTokenCount": len(prompt) // 4 + 8},
+            })
+        else:
+            self._send(404, {"error": {"code": 404, "message": f"Unknown path {path}", "status": "NOT_FOUND"}})
+
+    def log_message(self, format, *args):
+        print(f"[fake-model #{self.calls}] {format % args}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering.")
+    parser.add_argument("--straggler-rate", type=float, default=0.0, help="Fraction of requests that take 10x the latency.")
+    args = parser.parse_args()
+
+    FakeModelHandler.error_rate = args.error_rate
+    FakeModelHandler.latency = args.latency
+    FakeModelHandler.straggler_rate = args.straggler_rate
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeModelHandler)
+    print(f"Fake model server listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()